@@ -0,0 +1,115 @@
+"""
+Unified command line entry point.
+
+    python src/cli.py discover [--no-dns] [--output FILE] ...
+    python src/cli.py validate [--input FILE] [--output FILE]
+    python src/cli.py scrape [scraper options, e.g. --mode worker --profile]
+    python src/cli.py export --format csv --output jobs.csv
+
+Subcommand modules are imported only when their command runs, so
+requests/bs4/lxml are never loaded for lightweight commands (export,
+offline discover, --help). That keeps startup cheap enough to fan the CLI
+out as many short-lived processes (cron, per-tenant workers).
+"""
+
+import argparse
+import sys
+
+
+def cmd_discover(args):
+    from discovery import main as discover
+
+    paths = {
+        'known': args.known,
+        'starter_pack': args.starter_pack,
+        'ct_logs': args.ct_logs,
+        'google': args.google,
+        'company_names': args.companies,
+    }
+    discover(args.output, paths=paths, include_dns=not args.no_dns, dns_limit=args.dns_limit)
+
+
+def cmd_validate(args):
+    from validate_domains import get_valid_domains
+
+    get_valid_domains(args.input, args.output)
+
+
+def cmd_scrape(args):
+    from scraper import main as scrape
+
+    scrape(args.extra)
+
+
+def cmd_export(args):
+    """Convert a scraped all_jobs.json into JSON Lines or CSV"""
+    import json
+    from models import Job, write_jobs_csv, write_jobs_jsonl
+
+    with open(args.input, 'r') as f:
+        data = json.load(f)
+    jobs = (Job.from_dict(job) for job in data['jobs'])
+    if not args.keep_refs:
+        from text_normalize import rebuild_description
+        jobs = _expanded(jobs, data.get('boilerplate', {}), rebuild_description)
+
+    writer = write_jobs_csv if args.format == 'csv' else write_jobs_jsonl
+    newline = '' if args.format == 'csv' else None
+    with open(args.output, 'w', newline=newline) as f:
+        writer(jobs, f)
+    print(f"Exported {len(data['jobs'])} jobs to {args.output}")
+
+
+def _expanded(jobs, blocks, rebuild_description):
+    for job in jobs:
+        job.description = rebuild_description(job.description, blocks)
+        yield job
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Avature ATS scraper toolkit")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    discover = subparsers.add_parser('discover', help="Run all domain discovery sources concurrently")
+    discover.add_argument('--known', default='data/avature_urls_clean.txt')
+    discover.add_argument('--starter-pack', default='data/avature_urls_starter_pack.txt')
+    discover.add_argument('--ct-logs', default='data/crt_domain_results.json')
+    discover.add_argument('--google', default='data/domain_discovery.txt')
+    discover.add_argument('--companies', default='data/company_names.txt')
+    discover.add_argument('--output', default='data/discovered_new_domains.txt')
+    discover.add_argument('--no-dns', action='store_true', help="Skip the online DNS brute-force source")
+    discover.add_argument('--dns-limit', type=int, default=None, help="Cap the number of DNS lookups")
+    discover.set_defaults(func=cmd_discover)
+
+    validate = subparsers.add_parser('validate', help="Check domains for a working /careers/SearchJobs page")
+    validate.add_argument('--input', default='data/domain_discovery.txt')
+    validate.add_argument('--output', default='data/discover_valid_domains.txt')
+    validate.set_defaults(func=cmd_validate)
+
+    scrape = subparsers.add_parser('scrape', help="Scrape jobs (options are passed to scraper.py)",
+                                   add_help=False)
+    scrape.set_defaults(func=cmd_scrape)
+
+    export = subparsers.add_parser('export', help="Convert all_jobs.json to JSON Lines or CSV")
+    export.add_argument('--input', default='data/all_jobs.json')
+    export.add_argument('--output', required=True)
+    export.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    export.add_argument('--keep-refs', action='store_true',
+                        help="Leave {{boilerplate:<id>}} references unexpanded")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # Unknown options belong to scraper.py's own parser
+    args, extra = parser.parse_known_args(argv)
+    args.extra = extra
+    if extra and args.command != 'scrape':
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
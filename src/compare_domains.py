@@ -12,16 +12,16 @@ def compare_domains():
             domain = avature_domains_url.replace('https://', '').replace('/careers', '')
             original_domains.add(domain)
     new_domains = ct_domains - original_domains
-    return new_domains
+    return new_domains, ct_domains
 
 
 
 def main():
     print("Comparing CT domains with original list...")
     
-    new_domains = compare_domains()
+    new_domains, ct_domains = compare_domains()
     
-    print(f"\n✓ CT logs found: 20 total domains")
+    print(f"\n✓ CT logs found: {len(ct_domains)} total domains")
     print(f"✓ New domains (not in original): {len(new_domains)}")
     
     if len(new_domains) > 0:
@@ -35,7 +35,7 @@ def main():
                 f.write(domain + '\n')
         print(f"\nSaved to data/ct_new_domains.txt")
     else:
-        print("\nNo new domains found - all 20 were already in the original list")
+        print(f"\nNo new domains found - all {len(ct_domains)} were already in the original list")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+"""
+Multi-source Avature domain discovery.
+
+Runs every discovery source concurrently and merges their results in a
+single pass, deduplicating against the known domain list as results come
+in. Replaces running url_parser, parse_ct_logs, validate_domains and
+dns_enumeration by hand and reconciling them with compare_domains.
+
+Each source is a callable returning (domains, requests_made). Online
+sources read from local files (crt.sh dump, Google results list), so a
+fixture file can stand in for them.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from urllib.parse import urlparse
+
+from url_parser import extract_unique_domains
+from parse_ct_logs import parse_json, filter_domain
+from dns_enumeration import (load_existing_domains, generate_candidates, dns_lookup,
+                             validate_careers_page)
+
+
+DEFAULT_PATHS = {
+    'starter_pack': 'data/avature_urls_starter_pack.txt',
+    'ct_logs': 'data/crt_domain_results.json',
+    'google': 'data/domain_discovery.txt',
+    'company_names': 'data/company_names.txt',
+    'known': 'data/avature_urls_clean.txt',
+}
+
+VALIDATE_WORKERS = 16
+
+
+def source_starter_pack(input_file):
+    """Domains from the raw starter pack URL list (offline)"""
+    return extract_unique_domains(input_file), 0
+
+
+def source_ct_logs(input_file):
+    """Production domains from a crt.sh JSON dump (offline)"""
+    return parse_json(input_file), 0
+
+
+def source_google(input_file):
+    """
+    Domains from saved Google `site:avature.net` results.
+
+    Lines are hosts or host+path ("jacobs.avature.net/en_US/careers").
+    """
+    domains = set()
+    with open(input_file, 'r') as f:
+        for line in f:
+            entry = line.strip()
+            if not entry:
+                continue
+            domain = urlparse(f"//{entry}" if '://' not in entry else entry).netloc
+            if filter_domain(domain):
+                domains.add(domain)
+    return domains, 0
+
+
+def source_dns(company_names_file, known_domains, limit=None, resolver=dns_lookup):
+    """
+    Brute-force candidate subdomains through DNS, most promising first.
+
+    Args:
+        company_names_file: Path to file with company names
+        known_domains: Domains to skip (already known)
+        limit: Optional cap on the number of lookups
+        resolver: Function domain → bool, replaceable for offline runs
+    """
+    with open(company_names_file, 'r') as f:
+        companies = [line.strip() for line in f if line.strip()]
+
+    candidates = generate_candidates(companies, known_domains)
+    if limit is not None:
+        candidates = candidates[:limit]
+
+    domains = {subdomain for subdomain in candidates if resolver(subdomain)}
+    return domains, len(candidates)
+
+
+def build_sources(paths=None, known_domains=(), dns_limit=None, include_dns=True, resolver=dns_lookup):
+    """
+    Build the name → callable map of discovery sources.
+
+    Args:
+        paths: Dict overriding entries in DEFAULT_PATHS
+        known_domains: Set of already known domains (passed to the DNS source)
+        dns_limit: Optional cap on DNS lookups
+        include_dns: False to skip the (slow, online) DNS source
+        resolver: DNS lookup function for the DNS source
+
+    The raw starter pack is downloaded separately and not kept in the repo,
+    so that source is skipped when its file is missing.
+    """
+    paths = {**DEFAULT_PATHS, **(paths or {})}
+    sources = {}
+    if os.path.exists(paths['starter_pack']):
+        sources['starter_pack'] = partial(source_starter_pack, paths['starter_pack'])
+    else:
+        print(f"Skipping starter_pack source: {paths['starter_pack']} not found")
+    sources['ct_logs'] = partial(source_ct_logs, paths['ct_logs'])
+    sources['google'] = partial(source_google, paths['google'])
+    if include_dns:
+        sources['dns'] = partial(source_dns, paths['company_names'], known_domains, dns_limit, resolver)
+    return sources
+
+
+def _run_source(fn):
+    """Run one source, timing it and capturing any error"""
+    started = time.monotonic()
+    try:
+        domains, requests_made = fn()
+        error = None
+    except (OSError, ValueError) as e:
+        domains, requests_made, error = set(), 0, str(e)
+    return domains, requests_made, time.monotonic() - started, error
+
+
+def discover(sources, known_domains, validator=validate_careers_page, max_workers=None,
+             validate_workers=VALIDATE_WORKERS):
+    """
+    Run all sources concurrently, merge their results and validate new domains.
+
+    Results are merged as each source finishes: every domain goes through
+    filter_domain (drops sandbox/uat/... hosts) and is checked against a
+    running seen-set, so a domain is counted as new only for the first
+    source that reports it. New domains are handed straight to a
+    validation pool that checks /careers/SearchJobs, while the remaining
+    sources keep running.
+
+    Args:
+        sources: Dict of name → callable returning (domains, requests_made)
+        known_domains: Set of domains already in the registry
+        validator: Function domain → bool (one request per call)
+        max_workers: Source thread pool size (defaults to one per source)
+        validate_workers: Validation thread pool size
+
+    Returns:
+        (valid_domains, reports) - sorted list of new domains that passed
+        validation, and a per-source list of report dicts
+    """
+    seen = set(known_domains)
+    reports = {}
+    validations = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(sources) or 1) as pool, \
+            ThreadPoolExecutor(max_workers=validate_workers) as validate_pool:
+        futures = {pool.submit(_run_source, fn): name for name, fn in sources.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            domains, requests_made, elapsed, error = future.result()
+            new_count = 0
+            for domain in domains:
+                if domain not in seen and filter_domain(domain):
+                    seen.add(domain)
+                    validations[validate_pool.submit(validator, domain)] = (name, domain)
+                    new_count += 1
+            reports[name] = {
+                'source': name,
+                'found': len(domains),
+                'new': new_count,
+                'valid': 0,
+                'requests': requests_made + new_count,
+                'seconds': round(elapsed, 2),
+                'error': error,
+            }
+
+        valid_domains = []
+        for future in as_completed(validations):
+            name, domain = validations[future]
+            if future.result():
+                valid_domains.append(domain)
+                reports[name]['valid'] += 1
+
+    return sorted(valid_domains), list(reports.values())
+
+
+def print_report(reports):
+    """Print per-source yield and cost"""
+    print(f"\n{'Source':<14} {'Found':>7} {'New':>6} {'Valid':>6} {'Requests':>9} {'Seconds':>8}")
+    print("-" * 55)
+    for r in sorted(reports, key=lambda r: r['source']):
+        if r['error']:
+            print(f"{r['source']:<14} ✗ {r['error']}")
+        else:
+            print(f"{r['source']:<14} {r['found']:>7} {r['new']:>6} {r['valid']:>6} "
+                  f"{r['requests']:>9} {r['seconds']:>8}")
+
+
+def main(output_file='data/discovered_new_domains.txt', paths=None, include_dns=True, dns_limit=None):
+    print("=" * 70)
+    print("MULTI-SOURCE DOMAIN DISCOVERY")
+    print("=" * 70)
+
+    paths = {**DEFAULT_PATHS, **(paths or {})}
+    known = load_existing_domains(paths['known'])
+    print(f"\nLoaded {len(known)} known domains")
+
+    sources = build_sources(paths, known, dns_limit=dns_limit, include_dns=include_dns)
+    print(f"Running {len(sources)} sources concurrently: {', '.join(sources)}")
+
+    valid_domains, reports = discover(sources, known)
+    print_report(reports)
+
+    print(f"\n✓ New domains with a working careers page: {len(valid_domains)}")
+    with open(output_file, 'w') as f:
+        for domain in valid_domains:
+            f.write(domain + '\n')
+    print(f"Saved to {output_file}")
+
+    return valid_domains
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,145 @@
+import argparse
+import re
 import socket
-import requests
+from collections import Counter
 from time import sleep
 
+import profiling
+
+# Precompiled normalization rules - applied once per company name in batch
+SUFFIX_PATTERN = re.compile(
+    r'(?:[\s,]+(?:stores|inc\.?|corp\.?|corporation|company|co\.|ltd\.?|limited|'
+    r'group|holdings|international|services|plc|llc|lp))+$'
+)
+STRIP_PATTERN = re.compile(r'[\s\-.&,\'()/]+')
+HYPHEN_PATTERN = re.compile(r'[\s/]+')
+DROP_PATTERN = re.compile(r'[.,\'()]+')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+VALID_LABEL = re.compile(r'^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$')
+
+CAREER_PREFIXES = ['careers', 'jobs']
+COUNTRY_SUFFIXES = ['us', 'uk', 'ca', 'de', 'fr', 'au', 'in', 'br', 'mx', 'jp']
+
+# Subdomain "shapes" - used to learn which kinds of names Avature tenants use
+SHAPES = ['plain', 'hyphenated', 'acronym', 'career_prefix', 'country_suffix']
+
+
 def normalize_company_names(company_name):
-    variations = []
-    name = company_name.lower()
-    suffixes = [' stores', ' inc', ' corp', ' corporation', ' company', 
-                ' co.', ' ltd', ' limited', ' group', ' holdings', 
-                ' international', ' services']
-    for suffix in suffixes:
-        if name.endswith(suffix):
-            name = name.replace(suffix, '')
-            break
-    
-    clean = name.replace(' ', '').replace('-', '').replace('.', '').replace('&', '')
-    variations.append(clean)
-    
-    with_hyphens = name.replace(' ', '').replace('.', '').replace('&', 'and')
-    if with_hyphens != clean:
-        variations.append(with_hyphens)
-    
-    hyphenated = name.replace(' ', '-').replace('.', '').replace('&', 'and')
-    if hyphenated not in variations:
-        variations.append(hyphenated)
+    """
+    Generate the primary subdomain variations for a single company name.
     
+    Example:
+        normalize_company_names("Wal-Mart Stores") → ["walmart", "wal-mart"]
+    """
+    variations = []
+    for label, _ in _company_candidates(company_name)[:3]:
+        if label and VALID_LABEL.match(label) and label not in variations:
+            variations.append(label)
     return variations
 
 
+def _company_candidates(company_name):
+    """
+    Apply every rule to one company name.
+    
+    Returns:
+        List of (label, shape) tuples, primary variants first
+    """
+    name = SUFFIX_PATTERN.sub('', company_name.lower().strip())
+    with_and = name.replace('&', ' and ')
+    
+    clean = STRIP_PATTERN.sub('', name.replace('&', ''))
+    joined_and = STRIP_PATTERN.sub('', with_and)
+    hyphenated = HYPHEN_PATTERN.sub('-', DROP_PATTERN.sub('', with_and)).strip('-')
+    hyphenated = re.sub(r'-+', '-', hyphenated)
+    
+    candidates = [(clean, 'plain'), (joined_and, 'plain'), (hyphenated, 'hyphenated')]
+    
+    words = WORD_PATTERN.findall(name)
+    if len(words) >= 2:
+        candidates.append((''.join(w[0] for w in words), 'acronym'))
+    
+    for prefix in CAREER_PREFIXES:
+        candidates.append((f"{prefix}{clean}", 'career_prefix'))
+        candidates.append((f"{clean}{prefix}", 'career_prefix'))
+    
+    for country in COUNTRY_SUFFIXES:
+        candidates.append((f"{clean}{country}", 'country_suffix'))
+    
+    return candidates
+
+
+def learn_shape_priors(candidates, known_domains):
+    """
+    Estimate how likely each candidate shape is to be a real tenant.
+    
+    Known domains are matched back to the rule that generates them from a
+    company name (e.g. "deloitteuk" ← "Deloitte" via country_suffix), and
+    the rules' hit counts become priors. Known domains that no rule
+    produces from the company list tell us nothing and are ignored.
+    Add-one smoothing keeps unseen shapes possible; with no matches at all
+    the priors are uniform and generation order decides.
+    
+    Args:
+        candidates: (subdomain, shape) tuples, including known domains
+        known_domains: Set of domains like "deloitteuk.avature.net"
+    
+    Returns:
+        Dict mapping shape name → prior probability
+    """
+    counts = Counter({shape: 1 for shape in SHAPES})
+    for subdomain, shape in candidates:
+        if subdomain in known_domains:
+            counts[shape] += 1
+    total = sum(counts.values())
+    return {shape: counts[shape] / total for shape in SHAPES}
+
+
+def iter_candidates(companies, skip=()):
+    """
+    Stream deduplicated (subdomain, shape) candidates for a whole company list.
+    
+    Args:
+        companies: Iterable of company names
+        skip: Domains to leave out (e.g. ones already known)
+    
+    Yields:
+        Tuples like ("walmart.avature.net", "plain"), each subdomain once
+    """
+    seen = set(skip)
+    for company in companies:
+        for label, shape in _company_candidates(company):
+            if not label or not VALID_LABEL.match(label):
+                continue
+            subdomain = f"{label}.avature.net"
+            if subdomain in seen:
+                continue
+            seen.add(subdomain)
+            yield subdomain, shape
+
+
+def generate_candidates(companies, known_domains):
+    """
+    Build the ranked list of subdomains to test for the whole company list.
+    
+    Candidates are ordered by the learned prior of their shape, so the
+    expensive DNS stage checks the most promising names first. Generation
+    order (primary variants of each company first) breaks ties.
+    
+    Args:
+        companies: List of company names
+        known_domains: Set of domains already in the registry
+    
+    Returns:
+        List of subdomain strings, most promising first
+    """
+    candidates = list(iter_candidates(companies))
+    priors = learn_shape_priors(candidates, known_domains)
+    candidates = [item for item in candidates if item[0] not in known_domains]
+    candidates.sort(key=lambda item: -priors[item[1]])
+    return [subdomain for subdomain, _ in candidates]
+
+
 def dns_lookup(subdomain):
     """
     Check if a subdomain exists by doing a DNS lookup.
@@ -48,7 +161,8 @@ def dns_lookup(subdomain):
     """
     try:
         # Try to resolve the domain to an IP address
-        socket.gethostbyname(subdomain)
+        with profiling.stage('dns'):
+            socket.gethostbyname(subdomain)
         return True  # DNS resolved successfully
     except socket.gaierror:
         # DNS lookup failed - domain doesn't exist
@@ -70,12 +184,16 @@ def validate_careers_page(domain):
     Returns:
         True if /careers/SearchJobs returns 200, False otherwise
     """
+    # Imported here so candidate generation and DNS-only runs stay light
+    import requests
+    
     url = f"https://{domain}/careers/SearchJobs"
     
     try:
         # HEAD request is faster than GET - just checks if page exists
         # timeout=3 means give up after 3 seconds (don't wait forever)
-        response = requests.head(url, timeout=3)
+        with profiling.stage('http_validate'):
+            response = requests.head(url, timeout=3)
         
         # 200 = OK, page exists and is working
         return response.status_code == 200
@@ -84,7 +202,7 @@ def validate_careers_page(domain):
         return False
 
 
-def load_existing_domains():
+def load_existing_domains(url_file='data/avature_urls_clean.txt'):
     """
     Load domains we've already scraped to avoid duplicates.
     
@@ -93,13 +211,16 @@ def load_existing_domains():
     - No point testing domains we already know about
     - This saves time and shows we're being efficient
     
+    Args:
+        url_file: Cleaned careers URL list to read
+    
     Returns:
         Set of domain strings like {"nike.avature.net", "bloomberg.avature.net"}
     """
     existing = set()
     
     try:
-        with open('data/avature_urls_clean.txt', 'r') as f:
+        with open(url_file, 'r') as f:
             for line in f:
                 # Extract domain from "https://domain.avature.net/careers"
                 url = line.strip()
@@ -112,20 +233,20 @@ def load_existing_domains():
     return existing
 
 
-def enumerate_domains(company_names_file):
+def enumerate_domains(company_names_file, limit=None):
     """
     Main enumeration function - tests all company name variations.
     
     Process:
     1. Read company names from file
-    2. Normalize each name into potential subdomains
-    3. Check if DNS resolves (domain exists)
+    2. Normalize each name into potential subdomains, skipping existing domains
+    3. Check if DNS resolves (domain exists), most promising candidates first
     4. Validate /careers page exists
-    5. Check against existing domains
-    6. Return NEW working domains
+    5. Return NEW working domains
     
     Args:
         company_names_file: Path to file with company names
+        limit: Optional cap on the number of DNS lookups (top-ranked first)
     
     Returns:
         List of NEW valid Avature career domains
@@ -145,20 +266,15 @@ def enumerate_domains(company_names_file):
         companies = [line.strip() for line in f if line.strip()]
     print(f"Loaded {len(companies)} company names")
     
-    # Generate all subdomain variations
+    # Generate all subdomain variations, ranked by likelihood
     print("\n[3/5] Generating subdomain variations...")
-    all_subdomains = set()
+    with profiling.stage('candidates'):
+        all_subdomains = generate_candidates(companies, existing_domains)
     
-    for company in companies:
-        # Get variations like ["walmart", "wal-mart"]
-        variations = normalize_company_names(company)
-        
-        # Add .avature.net to each variation
-        for variation in variations:
-            subdomain = f"{variation}.avature.net"
-            all_subdomains.add(subdomain)
-    
-    print(f"Generated {len(all_subdomains)} unique subdomain variations to test")
+    print(f"Generated {len(all_subdomains)} unique subdomain variations")
+    if limit is not None and limit < len(all_subdomains):
+        all_subdomains = all_subdomains[:limit]
+        print(f"Testing the {limit} most promising (--limit)")
     
     # Test each subdomain
     print("\n[4/5] Testing subdomains for DNS resolution...")
@@ -187,42 +303,48 @@ def enumerate_domains(company_names_file):
     # Validate career pages
     print("\n[5/5] Validating /careers pages...")
     
-    valid_domains = []
+    # Existing domains were dropped while generating candidates, so every
+    # valid domain here is new
     new_domains = []
     
     for domain in dns_resolved:
         print(f"  Testing: {domain}...")
         
         if validate_careers_page(domain):
-            valid_domains.append(domain)
-            
-            # Check if it's NEW (not in existing list)
-            if domain not in existing_domains:
-                new_domains.append(domain)
-                print(f"    ✓ NEW valid domain found!")
-            else:
-                print(f"    ✓ Valid but already in existing list")
+            new_domains.append(domain)
+            print(f"    ✓ NEW valid domain found!")
         else:
             print(f"    ✗ No /careers page")
     
-    return new_domains, valid_domains
+    return new_domains
 
 
-def main():
+def main(argv=None):
     """
     Execute DNS enumeration and save results.
     """
-    company_file = 'data/company_names.txt'
-    
+    parser = argparse.ArgumentParser(description="DNS-based Avature domain discovery")
+    parser.add_argument('--companies', default='data/company_names.txt')
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Cap the number of DNS lookups (most promising candidates first)")
+    parser.add_argument('--profile', nargs='?', const='profile', default=None, metavar='DIR',
+                        help="Profile stages and write reports to DIR (default: profile/)")
+    args = parser.parse_args(argv)
+    
+    with profiling.session(args.profile):
+        run(args.companies, args.limit)
+
+
+def run(company_file, limit=None):
+    """Enumerate domains for company_file and report/save the new ones"""
     # Run enumeration
-    new_domains, all_valid = enumerate_domains(company_file)
+    new_domains = enumerate_domains(company_file, limit)
     
     # Results summary
     print("\n" + "="*70)
     print("ENUMERATION COMPLETE")
     print("="*70)
-    print(f"Total valid Avature domains found: {len(all_valid)}")
-    print(f"NEW domains (not in starter pack): {len(new_domains)}")
+    print(f"NEW valid Avature domains (not in starter pack): {len(new_domains)}")
     
     if new_domains:
         print(f"\n🎉 Discovered {len(new_domains)} new domains:")
@@ -0,0 +1,279 @@
+"""
+Per-tenant detail page extraction profiles.
+
+Most Avature tenants use the stock template, but some customize it, and
+trying a fixed list of class names on every page wastes fetches on junk.
+Instead, the first SAMPLE_SIZE detail pages of each tenant are tried
+against every candidate selector, the best one per field is kept, and the
+rest of that tenant's pages use a single targeted lookup per field.
+
+Learned profiles are cached in data/tenant_profiles.json and reused on
+later runs. A learned selector that misses falls back to the other
+candidates for that page; after MAX_MISSES pages in a row with a miss the
+tenant is re-learned (templates change). Profiles where nothing matched
+are not cached, so the next run samples the tenant again.
+
+Selector syntax:
+- CSS selector, e.g. 'div.article__content__view__field__value'
+- 'label:<text>' - the value of the Avature field whose label contains
+  <text> as whole words, e.g. 'label:Date Posted' (so 'label:Reference'
+  matches "Reference Number" but not "Preferred Qualifications")
+"""
+
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from urllib.parse import urljoin
+
+from text_normalize import normalize_text
+
+
+SAMPLE_SIZE = 3
+MAX_MISSES = 5          # consecutive pages with a missed selector before re-learning
+
+FIELD_CANDIDATES = {
+    'description': [
+        'div.article__content__view__field__value',
+        'div.article__content__view__field',
+        '[itemprop="description"]',
+        'div.job-description',
+        'div.article__content',
+        'article',
+    ],
+    'date_posted': [
+        '[itemprop="datePosted"]',
+        'label:Date Posted',
+        'label:Posted',
+        'label:Publication Date',
+        'time[datetime]',
+    ],
+    'job_id': [
+        '[itemprop="identifier"]',
+        'label:Job ID',
+        'label:Requisition',
+        'label:Reference',
+    ],
+    'apply_url': [
+        'a[href*="ApplicationMethods"]',
+        'a[href*="/Apply"]',
+        'a[href*="apply"]',
+    ],
+}
+
+
+def _label_value(soup, label_text):
+    """Return the value element of the Avature field labelled label_text"""
+    pattern = re.compile(rf'\b{re.escape(label_text)}\b', re.IGNORECASE)
+    for label in soup.select('.article__content__view__field__label'):
+        if pattern.search(label.get_text(' ', strip=True)):
+            return label.find_next_sibling(class_='article__content__view__field__value')
+    return None
+
+
+def extract_field(soup, field, selector, page_url):
+    """
+    Apply one selector to a parsed page.
+
+    Descriptions take the longest matching element (label/value fields such
+    as "Date Posted" share the description's class); other fields take the
+    first match.
+
+    Returns:
+        The field's text (or absolute URL for apply_url), or None
+    """
+    if selector.startswith('label:'):
+        element = _label_value(soup, selector[len('label:'):])
+    elif field == 'description':
+        matches = soup.select(selector)
+        element = max(matches, key=lambda el: len(el.get_text()), default=None)
+    else:
+        element = soup.select_one(selector)
+
+    if element is None:
+        return None
+    if field == 'apply_url':
+        href = element.get('href')
+        return urljoin(page_url, href) if href else None
+    if field == 'date_posted' and element.get('datetime'):
+        return element['datetime']
+    if field == 'description':
+        return normalize_text(element) or None
+    return element.get_text(separator=' ', strip=True) or None
+
+
+def trial_extract(soup, page_url):
+    """
+    Try every candidate selector for every field.
+
+    Returns:
+        (values, matched) - first non-empty value per field, and a list of
+        (field, selector, text length) for every candidate that matched
+    """
+    values = {}
+    matched = []
+    for field, candidates in FIELD_CANDIDATES.items():
+        values[field] = None
+        for selector in candidates:
+            value = extract_field(soup, field, selector, page_url)
+            if value:
+                matched.append((field, selector, len(value)))
+                if values[field] is None:
+                    values[field] = value
+    return values, matched
+
+
+class TenantProfile:
+    """
+    Learned selector per field for a single tenant.
+
+    While learning, every candidate is tried and hits are counted; once
+    SAMPLE_SIZE pages have been observed, the best candidate per field is
+    frozen into `selectors` (None when nothing matched).
+    """
+
+    def __init__(self, domain, selectors=None, stop_early=False):
+        self.domain = domain
+        self.selectors = selectors
+        self.stop_early = stop_early
+        self.samples = 0
+        self.misses = 0
+        self.truncation_safe = True
+        self.hits = defaultdict(Counter)
+
+    @property
+    def learned(self):
+        return self.selectors is not None
+
+    @property
+    def worth_fetching(self):
+        """False once learned and no field can be extracted from this tenant"""
+        return not self.learned or any(self.selectors.values())
+
+    def extract(self, soup, page_url, truncated_soup=None):
+        """
+        Extract all fields from a parsed detail page.
+
+        Uses the learned selectors, or tries every candidate (recording
+        hits) while the profile is still learning. During learning,
+        truncated_soup is the same page cut where streaming would stop
+        early; the profile only enables early stopping if every sample
+        yields the same values from the truncated page.
+        """
+        if self.learned:
+            return self._extract_learned(soup, page_url)
+
+        values, matched = trial_extract(soup, page_url)
+        for field, selector, _ in matched:
+            self.hits[field][selector] += 1
+        if truncated_soup is not None:
+            self.truncation_safe &= trial_extract(truncated_soup, page_url) == (values, matched)
+
+        self.samples += 1
+        if self.samples >= SAMPLE_SIZE:
+            self.finish()
+        return values
+
+    def _extract_learned(self, soup, page_url):
+        """Targeted lookups, falling back to the other candidates on a miss"""
+        values = {}
+        missed = False
+        for field, selector in self.selectors.items():
+            value = extract_field(soup, field, selector, page_url) if selector else None
+            if selector and value is None:
+                missed = True
+                for candidate in FIELD_CANDIDATES[field]:
+                    if candidate != selector:
+                        value = extract_field(soup, field, candidate, page_url)
+                        if value:
+                            break
+            values[field] = value
+
+        self.misses = self.misses + 1 if missed else 0
+        if self.misses >= MAX_MISSES:
+            self.relearn()
+        return values
+
+    def relearn(self):
+        """Drop the learned selectors and sample the tenant again"""
+        self.selectors = None
+        self.stop_early = False
+        self.samples = 0
+        self.misses = 0
+        self.truncation_safe = True
+        self.hits.clear()
+
+    def finish(self):
+        """
+        Freeze the best candidate per field.
+
+        Most hits wins; ties go to the earlier (more specific) candidate,
+        so a broad fallback like 'article' only wins when nothing narrower
+        matches.
+        """
+        self.selectors = {}
+        for field, candidates in FIELD_CANDIDATES.items():
+            best = max(candidates, key=lambda sel: self.hits[field][sel])
+            self.selectors[field] = best if self.hits[field][best] else None
+        self.stop_early = self.truncation_safe
+        self.hits.clear()
+
+    def to_dict(self):
+        return {'selectors': self.selectors, 'stop_early': self.stop_early}
+
+
+class ProfileCache:
+    """
+    In-memory tenant profiles, persisted to a JSON file.
+
+    Several workers can share one cache file: save() re-reads it and
+    merges, so profiles learned by other processes are kept.
+    """
+
+    def __init__(self, path='data/tenant_profiles.json'):
+        self.path = path
+        self.profiles = {domain: TenantProfile(domain, data['selectors'], data['stop_early'])
+                         for domain, data in self._read().items()}
+        self.loaded = set(self.profiles)
+
+    def _read(self):
+        """Return the profiles currently in the file (domain → dict)"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            # Profiles using a selector that is no longer a candidate are re-learned
+            return {domain: entry for domain, entry in data.items()
+                    if all(selector is None or selector in FIELD_CANDIDATES[field]
+                           for field, selector in entry['selectors'].items())}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError) as e:
+            print(f"Warning: ignoring unreadable profile cache {self.path}: {e}")
+            return {}
+
+    def get(self, domain):
+        """Return the profile for domain, creating an unlearned one if needed"""
+        if domain not in self.profiles:
+            self.profiles[domain] = TenantProfile(domain)
+        return self.profiles[domain]
+
+    def save(self):
+        """
+        Merge learned profiles into the cache file (atomically replacing it).
+
+        Entries other processes wrote since this cache was loaded are
+        kept. Profiles where no field matched are kept for this run only,
+        so a tenant that was down or mid-redesign while sampled is not
+        skipped forever; a loaded profile that went back to learning after
+        repeated misses is removed.
+        """
+        data = self._read()
+        for domain, profile in self.profiles.items():
+            if profile.learned and profile.worth_fetching:
+                data[domain] = profile.to_dict()
+            elif domain in self.loaded and not profile.learned:
+                data.pop(domain, None)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
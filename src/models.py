@@ -0,0 +1,134 @@
+"""
+Job record model and output serializers.
+
+Jobs used to be plain dicts, which cost a per-instance __dict__ and kept a
+separate copy of every location and domain string. Job uses __slots__ and
+interns the highly repeated values (company domain, location) so thousands
+of jobs from the same tenant share one string object.
+
+The field set covers everything the project brief asks for: title,
+description, application URL and metadata (location, date posted, job id).
+"""
+
+import csv
+import json
+import re
+import sys
+
+
+# Avature detail URLs end in the numeric job id, e.g. /careers/JobDetail/Some-Title/12345
+JOB_ID_PATTERN = re.compile(r'/JobDetail/(?:[^/?#]+/)?(\d+)|[?&]jobId=(\d+)')
+
+
+def parse_job_id(detail_url):
+    """Extract the numeric Avature job id from a detail URL, or None"""
+    match = JOB_ID_PATTERN.search(detail_url or '')
+    if match:
+        return match.group(1) or match.group(2)
+    return None
+
+
+# Requisition ids shown on detail pages: "12345", "REQ-2024-0012", "JR_88121"
+JOB_ID_VALUE = re.compile(r'^(?=[^\d]*\d)[A-Za-z0-9][A-Za-z0-9_-]{0,29}$')
+
+
+def looks_like_job_id(value):
+    """True for a short token with a digit and no spaces, e.g. REQ-2024-0012"""
+    return bool(value and JOB_ID_VALUE.match(value))
+
+
+def _intern(value):
+    """Intern a repeated string value, passing None through"""
+    if value is None:
+        return None
+    return sys.intern(value)
+
+
+class Job:
+    """
+    A single scraped job posting.
+
+    Fields are fixed by FIELDS; to_dict() yields them in that order so all
+    output formats share one stable schema.
+    """
+
+    FIELDS = ('job_id', 'title', 'detail_url', 'apply_url', 'location',
+              'date_posted', 'description', 'company_domain')
+
+    __slots__ = ('job_id', 'title', 'detail_url', 'apply_url', '_location',
+                 'date_posted', 'description', '_company_domain')
+
+    def __init__(self, title, detail_url, location="Not Specified", description=None,
+                 company_domain=None, apply_url=None, date_posted=None, job_id=None):
+        self.title = title
+        self.detail_url = detail_url
+        self.location = location
+        self.description = description
+        self.company_domain = company_domain
+        self.apply_url = apply_url
+        self.date_posted = date_posted
+        self.job_id = job_id if job_id is not None else parse_job_id(detail_url)
+
+    @property
+    def location(self):
+        return self._location
+
+    @location.setter
+    def location(self, value):
+        self._location = _intern(value)
+
+    @property
+    def company_domain(self):
+        return self._company_domain
+
+    @company_domain.setter
+    def company_domain(self, value):
+        self._company_domain = _intern(value)
+
+    def to_dict(self):
+        """Return the job as a plain dict in FIELDS order"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Job from a dict such as one loaded from all_jobs.json"""
+        return cls(**{field: data.get(field) for field in cls.FIELDS
+                      if data.get(field) is not None})
+
+    def __repr__(self):
+        return f"Job({self.job_id!r}, {self.title!r}, {self.company_domain!r})"
+
+
+def write_jobs_json(jobs, f, header):
+    """
+    Write the all_jobs.json envelope, serializing one job at a time.
+
+    Avoids building a second full list of dicts just to hand it to json.dump.
+
+    Args:
+        jobs: Iterable of Job records
+        f: Open text file to write to
+        header: Dict of top-level metadata written before the jobs array
+    """
+    f.write('{\n')
+    for key, value in header.items():
+        f.write(f'  {json.dumps(key)}: {json.dumps(value)},\n')
+    f.write('  "jobs": [')
+    for idx, job in enumerate(jobs):
+        f.write(',\n    ' if idx else '\n    ')
+        f.write(json.dumps(job.to_dict()))
+    f.write('\n  ]\n}\n')
+
+
+def write_jobs_jsonl(jobs, f):
+    """Write one JSON object per line"""
+    for job in jobs:
+        f.write(json.dumps(job.to_dict()) + '\n')
+
+
+def write_jobs_csv(jobs, f):
+    """Write jobs as CSV with a header row in FIELDS order"""
+    writer = csv.writer(f)
+    writer.writerow(Job.FIELDS)
+    for job in jobs:
+        writer.writerow([getattr(job, field) for field in Job.FIELDS])
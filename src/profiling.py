@@ -0,0 +1,160 @@
+"""
+Stage profiling for scraper and DNS enumeration runs (--profile DIR).
+
+Code marks its stages with `with profiling.stage('parse'):`. When no
+profiling session is active this is a shared no-op context, so the
+instrumentation costs next to nothing on normal runs.
+
+A session records, and writes to DIR on exit:
+- stages.txt         per-stage call count, total and mean wall time
+- stacks.collapsed   sampled stacks of the main thread and any thread in a
+                     stage, rooted at that stage ("parse;scraper.py:main;
+                     ... 42"), ready for flamegraph.pl or speedscope
+- allocations.txt    top-N allocation sites by size (tracemalloc)
+- cprofile.pstats    cProfile stats for the main thread
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+SAMPLE_INTERVAL = 0.005     # seconds between stack samples
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+
+_NOOP = nullcontext()
+_active = None
+
+
+class StageProfiler:
+    """Collects stage timings, sampled stacks and allocations for one run"""
+
+    def __init__(self, output_dir, interval=SAMPLE_INTERVAL, top_n=TOP_ALLOCATIONS):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_n = top_n
+        self.timings = defaultdict(lambda: [0, 0.0])
+        self.stacks = Counter()
+        self.thread_stages = defaultdict(list)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._cprofile = cProfile.Profile()
+
+    @contextmanager
+    def stage(self, name):
+        thread_id = threading.get_ident()
+        stages = self.thread_stages[thread_id]
+        stages.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stages.pop()
+            with self._lock:
+                timing = self.timings[name]
+                timing[0] += 1
+                timing[1] += elapsed
+
+    def _sample_loop(self):
+        sampler_id = threading.get_ident()
+        main_id = threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                stages = self.thread_stages.get(thread_id)
+                # Idle pool threads outside any stage would only add noise
+                if thread_id == sampler_id or (not stages and thread_id != main_id):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                root = stages[-1] if stages else 'other'
+                self.stacks[';'.join([root] + stack[::-1])] += 1
+
+    def start(self):
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._sampler = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self._sampler.start()
+        self._cprofile.enable()
+
+    def stop(self):
+        """Stop collecting and write all reports to output_dir"""
+        self._cprofile.disable()
+        self._stop.set()
+        self._sampler.join()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._cprofile.dump_stats(os.path.join(self.output_dir, 'cprofile.pstats'))
+
+        with open(os.path.join(self.output_dir, 'stacks.collapsed'), 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        with open(os.path.join(self.output_dir, 'allocations.txt'), 'w') as f:
+            f.write(f"Top {self.top_n} allocation sites still held at end of run\n\n")
+            for stat in snapshot.statistics('traceback')[:self.top_n]:
+                f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format()[-4:]:
+                    f.write(f"    {line}\n")
+                f.write("\n")
+
+        report = self.stage_report()
+        with open(os.path.join(self.output_dir, 'stages.txt'), 'w') as f:
+            f.write(report + "\n")
+        return report
+
+    def stage_report(self):
+        lines = [f"{'Stage':<16} {'Calls':>8} {'Total s':>10} {'Mean ms':>10}", "-" * 47]
+        for name, (count, total) in sorted(self.timings.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<16} {count:>8} {total:>10.2f} {total / count * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+def stage(name):
+    """Context manager timing a named stage (no-op unless a session is active)"""
+    if _active is None:
+        return _NOOP
+    return _active.stage(name)
+
+
+@contextmanager
+def session(output_dir):
+    """
+    Profile everything inside the block, writing reports to output_dir.
+
+    Passing output_dir=None disables profiling, so callers can write
+    `with profiling.session(args.profile):` unconditionally.
+    """
+    global _active
+    if output_dir is None:
+        yield None
+        return
+
+    profiler = StageProfiler(output_dir)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active = None
+        report = profiler.stop()
+        print("\n" + "=" * 70)
+        print("PROFILE")
+        print("=" * 70)
+        print(report)
+        print(f"\nReports written to {output_dir}/ (stages.txt, stacks.collapsed, allocations.txt, cprofile.pstats)")
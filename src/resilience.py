@@ -0,0 +1,209 @@
+"""
+Per-host circuit breakers and hedged requests.
+
+A degraded tenant can burn the full fetch timeout on each of its hundreds
+of detail pages. Each host gets:
+
+- a CircuitBreaker that opens after FAILURE_THRESHOLD consecutive failures
+  or latency-SLO breaches; while open, the tenant is deferred (raise
+  TenantDeferred) and retried after COOLDOWN_SECONDS
+- a LatencyTracker of recent response times; requests still running past
+  the host's p95 get a hedged duplicate, and whichever finishes first wins
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+
+FAILURE_THRESHOLD = 5       # consecutive failures/breaches before opening
+LATENCY_SLO = 5.0           # seconds - slower successes count as breaches
+COOLDOWN_SECONDS = 300      # how long a breaker stays open
+LATENCY_WINDOW = 200        # recent samples kept per host
+MIN_HEDGE_SAMPLES = 20      # don't hedge until p95 is meaningful
+HEDGE_WORKERS = 16
+
+
+class TenantDeferred(Exception):
+    """
+    Raised when a host's circuit is open; the tenant should be retried later.
+
+    A caller that had already collected jobs for the tenant attaches them as
+    `jobs` (and the listing page to continue from as `next_page`) before
+    re-raising, so a retry can resume instead of starting over.
+    """
+
+    def __init__(self, host, retry_at):
+        super().__init__(f"circuit open for {host}, retry after {time.strftime('%H:%M:%S', time.localtime(retry_at))}")
+        self.host = host
+        self.retry_at = retry_at
+        self.jobs = None
+        self.next_page = 0
+
+
+class CircuitBreaker:
+    """
+    Closed → open after FAILURE_THRESHOLD consecutive bad requests.
+    Open → half-open once the cooldown has passed: a single probe request
+    is let through, and its success closes the breaker while a failure
+    re-opens it. A probe that hasn't reported back within the latency SLO
+    (it would count as a breach anyway) is replaced by a new one.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, latency_slo=LATENCY_SLO,
+                 cooldown=COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.latency_slo = latency_slo
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def retry_at(self):
+        """Time a request may next be tried, or None if closed"""
+        if self.opened_at is None:
+            return None
+        retry_at = self.opened_at + self.cooldown
+        if self.probe_started is not None:
+            # A probe is out; check back once it has had time to answer
+            retry_at = max(retry_at, self.probe_started + self.latency_slo)
+        return retry_at
+
+    def allow(self):
+        """True if a request may be sent (closed, or this request is the half-open probe)"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.time() < self.retry_at:
+                return False
+            self.probe_started = time.time()
+            return True
+
+    def record_success(self, latency):
+        with self._lock:
+            if latency > self.latency_slo:
+                self._record_failure()
+            else:
+                self.consecutive_failures = 0
+                self.opened_at = None
+                self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._record_failure()
+
+    def _record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold or self.probe_started is not None:
+            self.opened_at = time.time()
+        self.probe_started = None
+
+
+class LatencyTracker:
+    """Sliding window of recent response times for one host"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+
+    def record(self, latency):
+        self.samples.append(latency)
+
+    def p95(self):
+        """95th percentile latency, or None with too few samples"""
+        if len(self.samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class HostHealth:
+    """Registry of breakers and latency trackers, keyed by host"""
+
+    def __init__(self):
+        self.breakers = {}
+        self.latencies = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def breaker(self, host):
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker()
+            return self.breakers[host]
+
+    def latency(self, host):
+        with self._lock:
+            if host not in self.latencies:
+                self.latencies[host] = LatencyTracker()
+            return self.latencies[host]
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='hedge')
+            return self._pool
+
+    def fetch(self, fetch_fn, url, **kwargs):
+        """
+        Fetch url through the host's breaker, hedging slow requests.
+
+        Args:
+            fetch_fn: Function (url, **kwargs) → html or None
+            url: URL to fetch
+
+        Returns:
+            html or None (same contract as fetch_fn)
+
+        Raises:
+            TenantDeferred: if the host's circuit is open
+        """
+        host = urlparse(url).netloc
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            raise TenantDeferred(host, breaker.retry_at)
+
+        tracker = self.latency(host)
+        hedge_after = tracker.p95()
+        self._count_request()
+        started = time.monotonic()
+
+        if hedge_after is None:
+            html = fetch_fn(url, **kwargs)
+        else:
+            html = self._hedged(fetch_fn, url, hedge_after, kwargs)
+
+        latency = time.monotonic() - started
+        if html is None:
+            breaker.record_failure()
+        else:
+            tracker.record(latency)
+            breaker.record_success(latency)
+        return html
+
+    def _hedged(self, fetch_fn, url, hedge_after, kwargs):
+        """Run fetch_fn, launching a duplicate if it outlives hedge_after"""
+        pool = self._executor()
+        pending = {pool.submit(fetch_fn, url, **kwargs)}
+        done, pending = wait(pending, timeout=hedge_after)
+        if not done:
+            self._count_request()
+            pending.add(pool.submit(fetch_fn, url, **kwargs))
+
+        # First non-None result wins; the loser finishes in the background
+        while True:
+            for future in done:
+                html = future.result()
+                if html is not None:
+                    return html
+            if not pending:
+                return None
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
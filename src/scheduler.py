@@ -0,0 +1,238 @@
+"""
+Yield-driven crawl scheduling.
+
+Instead of scraping tenants in file order, each tenant gets an estimated
+number of *new* jobs per request from its crawl history:
+
+- expected jobs     job count at the last crawl (unknown tenants get the
+                    average of tenants that have produced jobs)
+- churn             share of jobs that were new per day between crawls,
+                    averaged over crawls (starting from the default) so
+                    one quiet crawl doesn't pin it to 0; new jobs
+                    accumulate with time since the last crawl
+- success odds      tenant's successes / attempts, smoothed toward the
+                    overall success rate, then halved for every failure
+                    in a row, so dead tenants sink quickly but are never
+                    ruled out for good
+- cost              1 search page + listing pages + one detail page per
+                    job on success; what the tenant's last failed attempt
+                    actually cost (requests and seconds) on failure.
+                    Seconds come from the tenant's own timing, or the
+                    overall seconds per request before it has been timed
+
+Tenants are crawled highest score first, and a request or time budget cuts
+the plan off once the expected cost is spent. With a time budget, tenants
+are ranked by new jobs per second instead of per request, so slow hosts
+make way for fast ones. History lives in data/crawl_history.json and is
+updated after every tenant (local mode) or once the queue drains
+(coordinator mode).
+"""
+
+import json
+import math
+import os
+import time
+
+
+HISTORY_FILE = 'data/crawl_history.json'
+DEFAULT_CHURN_PER_DAY = 0.02    # share of a tenant's jobs that are new per day
+CHURN_WEIGHT = 0.5              # weight of the latest crawl in the churn average
+NEVER_CRAWLED_DAYS = 30         # assumed staleness of never-crawled tenants
+PAGE_SIZE = 12
+SECONDS_PER_DAY = 86400
+FAILURE_DECAY = 0.5             # success odds multiplier per consecutive failure
+DEFAULT_SECONDS_PER_REQUEST = 1.0   # before any crawl has been timed
+
+
+def load_history(path=HISTORY_FILE):
+    """Load per-tenant crawl history, or an empty dict"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_history(history, path=HISTORY_FILE):
+    """Write crawl history (atomically replacing the file)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def record_crawl(history, tenant, jobs, requests_made, seconds=None, now=None):
+    """
+    Update a tenant's history after a crawl attempt.
+
+    Args:
+        history: Dict loaded by load_history (updated in place)
+        tenant: Tenant URL as listed in the URL file
+        jobs: Job records scraped (empty list on failure)
+        requests_made: Requests spent on this tenant
+        seconds: Wall-clock time spent on this tenant, if measured
+    """
+    now = now or time.time()
+    entry = history.setdefault(tenant, {'attempts': 0, 'successes': 0, 'job_ids': []})
+    entry['attempts'] += 1
+
+    if not jobs:
+        entry['consecutive_failures'] = entry.get('consecutive_failures', 0) + 1
+        entry['failure_requests'] = requests_made
+        if seconds is not None:
+            entry['failure_seconds'] = seconds
+        return entry
+
+    entry['consecutive_failures'] = 0
+    entry['requests'] = requests_made
+    if seconds is not None:
+        entry['seconds'] = seconds
+
+    job_ids = sorted({job.job_id or job.detail_url for job in jobs})
+    previous = set(entry.get('job_ids', []))
+    new_jobs = len(job_ids) if not previous else len(set(job_ids) - previous)
+
+    if previous and entry.get('last_crawl'):
+        gap_days = max((now - entry['last_crawl']) / SECONDS_PER_DAY, 1.0)
+        observed = (new_jobs / len(job_ids)) / gap_days
+        churn = entry.get('churn_per_day', DEFAULT_CHURN_PER_DAY)
+        entry['churn_per_day'] = (1 - CHURN_WEIGHT) * churn + CHURN_WEIGHT * observed
+
+    entry['successes'] += 1
+    entry['last_crawl'] = now
+    entry['job_count'] = len(job_ids)
+    entry['new_jobs'] = new_jobs
+    entry['job_ids'] = job_ids
+    return entry
+
+
+def history_defaults(history):
+    """
+    Fallbacks for tenants with little or no history, from all tenants' records.
+
+    Returns:
+        Dict with job_count, p_success, seconds_per_request and
+        failure_requests
+    """
+    entries = history.values()
+    counts = [e['job_count'] for e in entries if e.get('job_count')]
+    attempts = sum(e.get('attempts', 0) for e in entries)
+    successes = sum(e.get('successes', 0) for e in entries)
+    timed = [e for e in entries if e.get('seconds') and e.get('requests')]
+    failed = [e['failure_requests'] for e in entries if 'failure_requests' in e]
+    return {
+        'job_count': sum(counts) / len(counts) if counts else PAGE_SIZE,
+        'p_success': (successes + 1) / (attempts + 2),
+        'seconds_per_request': (sum(e['seconds'] for e in timed) / sum(e['requests'] for e in timed)
+                                if timed else DEFAULT_SECONDS_PER_REQUEST),
+        'failure_requests': max(sum(failed) / len(failed), 1) if failed else 1,
+    }
+
+
+def estimate(tenant, history, defaults, cost='requests', now=None):
+    """
+    Estimate a tenant's expected new jobs and request/time cost.
+
+    Args:
+        tenant: Tenant URL
+        history: Dict from load_history
+        defaults: Dict from history_defaults
+        cost: 'requests' or 'seconds' - what the score is per
+
+    Returns:
+        Dict with expected_new, expected_requests, expected_seconds,
+        p_success and score (expected new jobs per request or second)
+    """
+    now = now or time.time()
+    entry = history.get(tenant, {})
+    attempts, successes = entry.get('attempts', 0), entry.get('successes', 0)
+    # Histories written before failures were tracked: a tenant that never
+    # succeeded has failed every attempt in a row
+    failure_streak = entry.get('consecutive_failures', 0 if successes else attempts)
+    p_success = ((successes + 2 * defaults['p_success']) / (attempts + 2)
+                 * FAILURE_DECAY ** failure_streak)
+    job_count = entry.get('job_count', defaults['job_count'])
+
+    if entry.get('last_crawl'):
+        days = (now - entry['last_crawl']) / SECONDS_PER_DAY
+        churn = entry.get('churn_per_day', DEFAULT_CHURN_PER_DAY)
+        fresh_share = 1 - math.exp(-churn * days)
+    else:
+        # Never scraped successfully: every job is new to us
+        days = NEVER_CRAWLED_DAYS
+        fresh_share = 1.0
+
+    if entry.get('seconds') and entry.get('requests'):
+        seconds_per_request = entry['seconds'] / entry['requests']
+    else:
+        seconds_per_request = defaults['seconds_per_request']
+    full_cost = 1 + math.ceil(job_count / PAGE_SIZE) + job_count
+    failure_requests = entry.get('failure_requests', defaults['failure_requests'])
+    failure_seconds = entry.get('failure_seconds', failure_requests * seconds_per_request)
+
+    expected_requests = p_success * full_cost + (1 - p_success) * failure_requests
+    expected_seconds = p_success * full_cost * seconds_per_request + (1 - p_success) * failure_seconds
+    expected_new = p_success * job_count * fresh_share
+    spend = expected_seconds if cost == 'seconds' else expected_requests
+
+    return {
+        'tenant': tenant,
+        'p_success': p_success,
+        'expected_new': expected_new,
+        'expected_requests': expected_requests,
+        'expected_seconds': expected_seconds,
+        'days_since_crawl': days,
+        'score': expected_new / spend if spend else 0.0,
+    }
+
+
+def build_schedule(tenants, history, max_requests=None, max_seconds=None, now=None):
+    """
+    Order tenants by expected new jobs per request (per second with a time budget).
+
+    Args:
+        tenants: Tenant URLs to consider
+        history: Dict from load_history
+        max_requests: Optional request budget; tenants are taken best
+            first until their cumulative expected requests reach it
+        max_seconds: Optional time budget, applied the same way
+
+    Returns:
+        List of estimate dicts (see estimate), best first
+    """
+    defaults = history_defaults(history)
+    cost = 'seconds' if max_seconds is not None else 'requests'
+    plan = sorted((estimate(t, history, defaults, cost, now) for t in dict.fromkeys(tenants)),
+                  key=lambda e: -e['score'])
+
+    if max_requests is not None or max_seconds is not None:
+        budgeted, requests_spent, seconds_spent = [], 0.0, 0.0
+        for item in plan:
+            if ((max_requests is not None and requests_spent >= max_requests)
+                    or (max_seconds is not None and seconds_spent >= max_seconds)):
+                break
+            requests_spent += item['expected_requests']
+            seconds_spent += item['expected_seconds']
+            budgeted.append(item)
+        plan = budgeted
+    return plan
+
+
+def print_schedule(plan, limit=None):
+    """Print the crawl plan with per-tenant and cumulative estimates"""
+    print(f"\n{'#':>4}  {'Tenant':<45} {'Score':>7} {'New':>7} {'Reqs':>7} {'Secs':>7} {'P(ok)':>6} {'Days':>5}")
+    print("-" * 95)
+    shown = plan if limit is None else plan[:limit]
+    for rank, item in enumerate(shown, 1):
+        tenant = item['tenant'].replace('https://', '')[:45]
+        print(f"{rank:>4}  {tenant:<45} {item['score']:>7.3f} {item['expected_new']:>7.1f} "
+              f"{item['expected_requests']:>7.1f} {item['expected_seconds']:>7.0f} {item['p_success']:>6.2f} "
+              f"{item['days_since_crawl']:>5.0f}")
+    if limit is not None and len(plan) > limit:
+        print(f"  ... {len(plan) - limit} more tenants")
+
+    total_new = sum(item['expected_new'] for item in plan)
+    total_requests = sum(item['expected_requests'] for item in plan)
+    total_minutes = sum(item['expected_seconds'] for item in plan) / 60
+    print(f"\nEstimated yield: {total_new:.0f} new jobs from {total_requests:.0f} requests "
+          f"({total_minutes:.0f} min) across {len(plan)} tenants")
@@ -10,42 +10,211 @@ Main Features:
 - Job description extraction from detail pages
 - Incremental progress saving
 - Robust error handling
+- Distributed coordinator/worker mode over a shared queue (work_queue.py)
 
 Author: Sky Stanoyevitch
 Date: January 2026
 """
 
+import argparse
+import os
 import requests
+import urllib3
 import re
 import math
-import json
+import socket
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
 from datetime import datetime
 
 # 3rd Party Libs
 from bs4 import BeautifulSoup
 
+import profiling
+from extraction import ProfileCache
+from models import Job, looks_like_job_id, write_jobs_json
+from resilience import HostHealth, TenantDeferred
+from text_normalize import BoilerplateStore
+from scheduler import (HISTORY_FILE, build_schedule, load_history, print_schedule,
+                       record_crawl, save_history)
+from work_queue import WorkQueue
 
-def fetch_page(url):
+
+# Response reading limits - keeps memory per in-flight request bounded
+CHUNK_SIZE = 16 * 1024          # most bytes read from the socket at a time
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # hard cap on body size (2 MB)
+FETCH_DEADLINE = 30             # total seconds allowed per request, not per read
+READ_TIMEOUT = 10               # longest single socket wait
+
+# Detail pages can stop streaming once the description container has closed
+DESCRIPTION_MARKERS = (b'article__content__view__field', b'</article>')
+
+# Per-host circuit breakers and latency tracking (see resilience.py)
+HOST_HEALTH = HostHealth()
+
+# Learned per-tenant detail page selectors (see extraction.py)
+PROFILE_CACHE_FILE = "data/tenant_profiles.json"
+_profile_cache = None
+
+# Description blocks repeated within a tenant, stored once per run
+BOILERPLATE = BoilerplateStore()
+
+
+def fetch_page(url, max_bytes=MAX_RESPONSE_BYTES, deadline=FETCH_DEADLINE, stop_markers=None):
     """
-    Fetch HTML content from a URL with timeout and error handling.
+    Fetch HTML content from a URL, streaming the body in bounded chunks.
+    
+    The connect/read timeout only limits each socket operation, so a host
+    that trickles bytes can hold a request open indefinitely. The body is
+    therefore read chunk by chunk against a total deadline and a byte cap;
+    every socket read returns whatever has arrived and may wait no longer
+    than the time left before the deadline.
     
     Args:
         url (str): The URL to fetch
+        max_bytes (int): Stop reading once this many bytes are buffered
+        deadline (float): Total seconds allowed for connect + full body
+        stop_markers (tuple): Optional (start, end) byte markers - reading
+            stops early once `end` has been seen after `start`
         
     Returns:
-        str: HTML content if successful, None if error occurs
+        str: HTML content if successful (possibly truncated at max_bytes
+             or a stop marker), None if error occurs or deadline passes
         
     Raises:
         No exceptions raised - errors are caught and logged
     """
+    started = time.monotonic()
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
+        # DNS + TCP + TLS + waiting for the server's headers; under --profile
+        # the dns and tcp_connect parts are also timed on their own
+        with profiling.stage('connect'):
+            response = requests.get(url, timeout=READ_TIMEOUT, stream=True)
+        with response, profiling.stage('download'):
+            response.raise_for_status()
+            
+            body = bytearray()
+            start_pos = -1
+            for chunk in _read_chunks(response, started + deadline):
+                if chunk is None:
+                    print(f"Error fetching {url}: exceeded {deadline}s deadline")
+                    return None
+                
+                # Only rescan the new chunk (plus overlap for split markers)
+                scan_from = max(0, len(body) - 64)
+                body.extend(chunk)
+                
+                if stop_markers:
+                    start_marker, end_marker = stop_markers
+                    if start_pos < 0:
+                        start_pos = body.find(start_marker, scan_from)
+                    if start_pos >= 0 and body.find(end_marker, max(start_pos, scan_from)) >= 0:
+                        break
+                
+                if len(body) >= max_bytes:
+                    print(f"  ⚠️  Warning: {url} exceeded {max_bytes} bytes, truncating")
+                    del body[max_bytes:]
+                    break
+            
+            encoding = response.encoding or 'utf-8'
+            return body.decode(encoding, errors='replace')
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError, LookupError) as e:
         print(f"Error fetching {url}: {e}")
         return None
+
+
+def _response_socket(raw):
+    """The socket a streamed urllib3 response reads from, or None"""
+    sock = getattr(raw.connection, 'sock', None)
+    if sock is None:
+        # On 'Connection: close' http.client hands the socket over to the
+        # response and clears connection.sock; reach it through the file
+        fp = getattr(getattr(raw, '_fp', None), 'fp', None)
+        sock = getattr(getattr(fp, 'raw', None), '_sock', None)
+    return sock
+
+
+_create_connection = urllib3.util.connection.create_connection
+
+
+def _staged_create_connection(address, *args, **kwargs):
+    """
+    urllib3's create_connection with name resolution and the TCP connect
+    timed as separate 'dns' and 'tcp_connect' stages.
     
+    The host is resolved once here and each address is then tried in
+    order, as urllib3 does, so this adds no lookups.
+    """
+    host, port = address
+    with profiling.stage('dns'):
+        addresses = socket.getaddrinfo(host.strip('[]'), port,
+                                       urllib3.util.connection.allowed_gai_family(),
+                                       socket.SOCK_STREAM)
+    error = OSError(f"getaddrinfo returned no addresses for {host}")
+    for *_, sockaddr in addresses:
+        try:
+            with profiling.stage('tcp_connect'):
+                return _create_connection((sockaddr[0], port), *args, **kwargs)
+        except OSError as e:
+            error = e
+    raise error
+
+
+@contextmanager
+def connect_stages(enabled=True):
+    """Split the 'connect' stage into dns/tcp_connect timings while active"""
+    if not enabled:
+        yield
+        return
+    urllib3.util.connection.create_connection = _staged_create_connection
+    try:
+        yield
+    finally:
+        urllib3.util.connection.create_connection = _create_connection
+
+
+def _read_chunks(response, deadline_at):
+    """
+    Yield body chunks of up to CHUNK_SIZE bytes, or None once deadline_at passes.
+    
+    read1() returns as soon as any bytes are available (iter_content waits
+    for a full chunk), and the socket timeout is cut to the time left, so
+    a trickling host cannot stretch a read past the deadline.
+    """
+    raw = response.raw
+    sock = _response_socket(raw)
+    while True:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            yield None
+            return
+        # (fileno is -1 once the body is complete and urllib3 closed it)
+        if sock is not None and sock.fileno() != -1:
+            sock.settimeout(min(READ_TIMEOUT, remaining))
+        try:
+            chunk = raw.read1(CHUNK_SIZE, decode_content=True)
+        except urllib3.exceptions.ReadTimeoutError:
+            if deadline_at - time.monotonic() <= 0:
+                yield None
+                return
+            raise
+        if not chunk:
+            return
+        yield chunk
+    
+
+def fetch_page_guarded(url, **kwargs):
+    """
+    fetch_page through the host's circuit breaker, hedging slow requests.
+    
+    Raises:
+        TenantDeferred: if the host's circuit is open - the caller should
+            give up on this tenant for now and retry it later
+    """
+    return HOST_HEALTH.fetch(fetch_page, url, **kwargs)
+
 
 def parse_total_jobs(html):
     """Extract total job count from results text"""
@@ -63,7 +232,14 @@ def parse_total_jobs(html):
 
 def extract_jobs(html):
     """Extract job listings from a page"""
-    soup = BeautifulSoup(html, 'lxml')
+    with profiling.stage('parse'):
+        soup = BeautifulSoup(html, 'lxml')
+    with profiling.stage('extract'):
+        return _extract_articles(soup)
+
+
+def _extract_articles(soup):
+    """Build Job records from the result articles of a parsed search page"""
     articles = soup.find_all('article', class_='article--result')
     jobs = []
     for article in articles:
@@ -75,47 +251,102 @@ def extract_jobs(html):
             location = location_element.text.strip()
         else:
             location = "Not Specified"
-        job = {'title': title, 'detail_url': detail_url, 'location': location}
-        jobs.append(job)
+        jobs.append(Job(title, detail_url, location))
     return jobs
 
 
-def scrape_job_description(detail_url, base_domain):
-    """Fetch and extract job description from detail page"""
+def truncate_at_markers(html, stop_markers):
+    """Cut html where fetch_page would stop streaming for stop_markers"""
+    start_marker, end_marker = (m.decode() for m in stop_markers)
+    start = html.find(start_marker)
+    end = html.find(end_marker, start) if start >= 0 else -1
+    if end < 0:
+        return html
+    return html[:end + len(end_marker)]
+
+
+def get_profile_cache():
+    """Return the process-wide tenant extraction profile cache"""
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = ProfileCache(PROFILE_CACHE_FILE)
+    return _profile_cache
+
+
+def use_profile_cache(path):
+    """Load and save tenant profiles at path instead of PROFILE_CACHE_FILE"""
+    global _profile_cache
+    _profile_cache = ProfileCache(path)
+
+
+def scrape_job_details(job, base_domain, profile):
+    """
+    Fetch a job's detail page and fill in description, apply URL, date
+    posted and job id using the tenant's extraction profile.
+    
+    Args:
+        job: Job record from extract_jobs (updated in place)
+        base_domain: Site URL the job was listed on
+        profile: TenantProfile for this site (learned on first pages)
+    
+    Returns:
+        The same Job record
+    """
     # Check if detail_url is already a complete URL
-    if detail_url.startswith('http'):
-        full_url = detail_url
+    if job.detail_url.startswith('http'):
+        full_url = job.detail_url
     else:
-        full_url = f"{base_domain}{detail_url}"
+        full_url = f"{base_domain}{job.detail_url}"
     
-    html = fetch_page(full_url)
-    if html is None:
-        return "Description unavailable - page failed to load"
-    
-    soup = BeautifulSoup(html, 'lxml')
-    description_div = soup.find('div', class_='article__content__view__field__value')
+    # Tenant template has nothing we can extract - don't waste the fetch
+    if not profile.worth_fetching:
+        job.description = "Description not found on page"
+        return job
     
-    if description_div:
-        description = description_div.get_text(separator='\n', strip=True)
-        return description
+    learning = not profile.learned
+    stop_markers = DESCRIPTION_MARKERS if profile.stop_early else None
+    html = fetch_page_guarded(full_url, stop_markers=stop_markers)
+    if html is None:
+        job.description = "Description unavailable - page failed to load"
+        return job
+    
+    with profiling.stage('parse'):
+        soup = BeautifulSoup(html, 'lxml')
+        truncated_soup = None
+        if learning:
+            truncated_soup = BeautifulSoup(truncate_at_markers(html, DESCRIPTION_MARKERS), 'lxml')
+    with profiling.stage('extract'):
+        values = profile.extract(soup, full_url, truncated_soup)
+    
+    if learning and profile.learned:
+        get_profile_cache().save()
+    
+    if values['description']:
+        job.description = BOILERPLATE.dedupe(values['description'], profile.domain)
     else:
-        description_div = soup.find('div', class_='article__content__view__field')
-        if description_div:
-            description = description_div.get_text(separator='\n', strip=True)
-            return description
-        
-        return "Description not found on page"
+        job.description = "Description not found on page"
+    job.apply_url = values['apply_url']
+    job.date_posted = values['date_posted']
+    # Label values can be prose ("5 years Python"); keep the URL's id unless
+    # the page gives something id-shaped
+    if looks_like_job_id(values['job_id']):
+        job.job_id = values['job_id']
+    return job
 
 
-def scrape_single_site(base_domain):
+def scrape_job_description(detail_url, base_domain):
+    """Fetch and extract job description from detail page"""
+    domain_name, _ = build_search_url(base_domain)
+    job = scrape_job_details(Job(None, detail_url), base_domain, get_profile_cache().get(domain_name))
+    return job.description
+
+
+def build_search_url(base_domain):
     """
-    Scrape all jobs from a single Avature site.
-    
-    Args:
-        base_domain: Full domain URL like 'https://bloomberg.avature.net' or 'https://bloomberg.avature.net/careers'
+    Normalize a site URL into its display name and SearchJobs URL.
     
     Returns:
-        List of job dictionaries with all data, or empty list on failure
+        Tuple of (domain_name, search_url)
     """
     # Extract domain name for display
     domain_name = base_domain.replace('https://', '').replace('http://', '')
@@ -125,43 +356,99 @@ def scrape_single_site(base_domain):
     if base_clean.endswith('/careers'):
         base_clean = base_clean[:-8]  # Remove '/careers'
     
-    # Build search URL
-    search_url = f"{base_clean}/careers/SearchJobs"
+    return domain_name, f"{base_clean}/careers/SearchJobs"
+
+
+def scrape_single_site(base_domain, jobs=None, next_page=0):
+    """
+    Scrape all jobs from a single Avature site.
+    
+    If the host's circuit opens partway through, the TenantDeferred carries
+    the work done so far: `e.jobs` (jobs collected; a description of None
+    means its details are still unfetched) and `e.next_page` (first listing
+    page not yet fetched, or None once all listings are in). Passing both
+    back in resumes the crawl where it stopped.
+    
+    Args:
+        base_domain: Full domain URL like 'https://bloomberg.avature.net' or 'https://bloomberg.avature.net/careers'
+        jobs: Jobs collected by a deferred earlier attempt
+        next_page: Listing page to resume from (None: listings complete)
+    
+    Returns:
+        List of Job records with all data, or empty list on failure
+    """
+    domain_name, search_url = build_search_url(base_domain)
+    all_jobs = [] if jobs is None else jobs
     
     print("=" * 60)
     print(f"Scraping {domain_name}")
     print("=" * 60)
     
+    try:
+        if next_page is not None:
+            _scrape_listings(all_jobs, next_page, search_url, domain_name)
+    except TenantDeferred as e:
+        e.jobs = all_jobs
+        raise
+    
+    if not all_jobs:
+        return []
+    
+    # Step 3: Fetch descriptions for each job
+    pending = sum(1 for job in all_jobs if job.description is None)
+    print(f"\n[3/3] Fetching job descriptions ({pending}/{len(all_jobs)} left)...")
+    if pending > 50:
+        print("This will take a few minutes...")
+    
+    return _scrape_descriptions(all_jobs, base_domain, domain_name)
+
+
+def _scrape_listings(all_jobs, next_page, search_url, domain_name):
+    """
+    Collect listing pages from next_page on into all_jobs.
+    
+    Raises:
+        TenantDeferred: with next_page set to the page to resume from
+    """
     # Step 1: Fetch first page and get total count
     print("\n[1/3] Fetching job count...")
-    html = fetch_page(search_url)
+    try:
+        html = fetch_page_guarded(search_url)
+    except TenantDeferred as e:
+        e.next_page = next_page
+        raise
     if html is None:
         print(f"✗ Error: Could not fetch careers page for {domain_name}")
-        return []
+        return
     
     total_jobs = parse_total_jobs(html)
     if total_jobs == 0:
         print(f"No jobs found on {domain_name}")
-        return []
+        return
     
     total_pages = math.ceil(total_jobs / 12)
     print(f"Found {total_jobs} total jobs across {total_pages} pages")
     
     # Step 2: Scrape all job listings (titles, URLs, locations)
-    print(f"\n[2/3] Scraping job listings...")
-    all_jobs = []
+    print(f"\n[2/3] Scraping job listings" + (f" from page {next_page + 1}..." if next_page else "..."))
     
-    for page in range(total_pages):
+    for page in range(next_page, total_pages):
         if page == 0:
             page_html = html
         else:
             page_offset = page * 12
-            page_html = fetch_page(f"{search_url}?jobRecordsPerPage=12&jobOffset={page_offset}")
+            try:
+                page_html = fetch_page_guarded(f"{search_url}?jobRecordsPerPage=12&jobOffset={page_offset}")
+            except TenantDeferred as e:
+                e.next_page = page
+                raise
             if page_html is None:
                 print(f"  ⚠️  Warning: Failed to fetch page {page + 1}, skipping...")
                 continue
         
         page_jobs = extract_jobs(page_html)
+        for job in page_jobs:
+            job.company_domain = domain_name
         all_jobs.extend(page_jobs)
         
         # Progress update every 10 pages
@@ -169,21 +456,25 @@ def scrape_single_site(base_domain):
             print(f"  Progress: {page + 1}/{total_pages} pages ({len(all_jobs)} jobs collected)")
     
     print(f"✓ Collected {len(all_jobs)} job listings")
-    
-    # Step 3: Fetch descriptions for each job
-    print(f"\n[3/3] Fetching job descriptions...")
-    if len(all_jobs) > 50:
-        print("This will take a few minutes...")
-    
-    for idx, job in enumerate(all_jobs):
-        description = scrape_job_description(job['detail_url'], base_domain)
-        job['description'] = description
-        job['company_domain'] = domain_name
-        
-        # Progress update every 50 jobs
-        if (idx + 1) % 50 == 0:
-            percentage = ((idx + 1) / len(all_jobs)) * 100
-            print(f"  Progress: {idx + 1}/{len(all_jobs)} ({percentage:.1f}%) descriptions fetched")
+
+
+def _scrape_descriptions(all_jobs, base_domain, domain_name):
+    """Fetch details for every job still missing a description"""
+    profile = get_profile_cache().get(domain_name)
+    try:
+        for idx, job in enumerate(all_jobs):
+            if job.description is not None:
+                continue        # fetched before an earlier deferral
+            scrape_job_details(job, base_domain, profile)
+            
+            # Progress update every 50 jobs
+            if (idx + 1) % 50 == 0:
+                percentage = ((idx + 1) / len(all_jobs)) * 100
+                print(f"  Progress: {idx + 1}/{len(all_jobs)} ({percentage:.1f}%) descriptions fetched")
+    except TenantDeferred as e:
+        # Keep the work done so far; the retry picks up the unfinished jobs
+        e.jobs, e.next_page = all_jobs, None
+        raise
     
     print(f"✓ Fetched {len(all_jobs)} job descriptions")
     
@@ -192,25 +483,211 @@ def scrape_single_site(base_domain):
     print(f"COMPLETE: {domain_name}")
     print("=" * 60)
     print(f"Total jobs scraped: {len(all_jobs)}")
-    successful = sum(1 for j in all_jobs if 'Description unavailable' not in j.get('description', ''))
+    successful = sum(1 for j in all_jobs if 'Description unavailable' not in (j.description or ''))
     print(f"Jobs with descriptions: {successful}")
     
     return all_jobs
 
 
-def main():
+def read_urls(url_file):
+    """Read the list of careers URLs to scrape"""
+    with open(url_file, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def run_coordinator(queue_path, url_file, output_file, poll_interval=10, history_file=HISTORY_FILE):
+    """
+    Seed the shared queue with tenants (best expected yield first) and wait
+    for workers to drain it.
+    
+    Listing-page tasks are added by workers as they discover page counts.
+    Once nothing is pending or leased, merged results are written out and
+    every tenant's crawl is recorded in the history, using the requests
+    and time the workers reported for it.
+    """
+    queue = WorkQueue(queue_path)
+    # Workers wait until seeding is done; a finished earlier run is cleared
+    if queue.begin_run():
+        print(f"Cleared the finished previous run from {queue_path}")
+    # Tasks are leased in insertion order, so seed best-yield tenants first
+    history = load_history(history_file)
+    plan = build_schedule(read_urls(url_file), history)
+    all_urls = [item['tenant'] for item in plan]
+    for url in all_urls:
+        queue.enqueue('tenant', {'base_domain': url})
+    queue.mark_seeded()
+    print(f"Seeded {len(all_urls)} tenants into {queue_path}")
+    
+    while not queue.is_drained():
+        print(f"  Queue status: {queue.counts()}")
+        time.sleep(poll_interval)
+    
+    jobs = queue.load_jobs()
+    save_jobs_to_json(jobs, output_file, queue.load_boilerplate())
+    print(f"✓ Queue drained: {queue.counts()}")
+    print(f"✓ Saved {len(jobs)} jobs to {output_file}")
+    
+    jobs_by_domain = {}
+    for job in jobs:
+        jobs_by_domain.setdefault(job.company_domain, []).append(job)
+    costs = queue.load_costs()
+    # Tenants without a recorded cost were not crawled by this run's workers
+    for url in all_urls:
+        if url in costs:
+            requests_made, seconds = costs[url]
+            record_crawl(history, url, jobs_by_domain.get(build_search_url(url)[0], []),
+                         requests_made, seconds)
+    save_history(history, history_file)
+
+
+def _heartbeat_loop(queue, task_id, worker_id, stop):
+    """Keep a task lease alive until stop is set"""
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.heartbeat(task_id, worker_id):
+            print(f"  ⚠️  Lost lease on task {task_id}")
+            return
+
+
+def process_task(queue, kind, payload):
+    """
+    Run one leased task.
+    
+    - tenant: fetch the first search page and enqueue one listing task per page
+    - listing: scrape one page of results plus its job descriptions
+    """
+    base_domain = payload['base_domain']
+    domain_name, search_url = build_search_url(base_domain)
+    
+    if kind == 'tenant':
+        html = fetch_page_guarded(search_url)
+        if html is None:
+            raise RuntimeError(f"Could not fetch careers page for {domain_name}")
+        total_pages = math.ceil(parse_total_jobs(html) / 12)
+        for page in range(total_pages):
+            queue.enqueue('listing', {'base_domain': base_domain, 'offset': page * 12})
+        print(f"  {domain_name}: queued {total_pages} listing pages")
+    
+    elif kind == 'listing':
+        page_html = fetch_page_guarded(f"{search_url}?jobRecordsPerPage=12&jobOffset={payload['offset']}")
+        if page_html is None:
+            raise RuntimeError(f"Failed to fetch {domain_name} offset {payload['offset']}")
+        jobs = extract_jobs(page_html)
+        profile = get_profile_cache().get(domain_name)
+        for job in jobs:
+            scrape_job_details(job, base_domain, profile)
+            job.company_domain = domain_name
+        queue.save_boilerplate(BOILERPLATE.blocks)
+        queue.save_jobs(jobs)
+        print(f"  {domain_name} offset {payload['offset']}: saved {len(jobs)} jobs")
+    
+    else:
+        raise ValueError(f"Unknown task kind: {kind}")
+
+
+def run_worker(queue_path, worker_id, idle_wait=5):
+    """
+    Lease and process tasks from the shared queue until it is drained.
+    
+    A worker started before the coordinator keeps polling until the queue
+    has been seeded, so an empty queue is not mistaken for a finished one.
+    Likewise a finished run left in a reused queue file only ends the
+    worker if it took part in that run or the run was seeded after the
+    worker started; otherwise it waits for the coordinator's next run.
+    While a task runs, a heartbeat thread extends its lease. If this worker
+    dies, the lease expires and another worker picks the task up.
+    """
+    queue = WorkQueue(queue_path)
+    processed = 0
+    started = time.time()
+    joined = False
+    print(f"Worker {worker_id} polling {queue_path}")
+    
+    while True:
+        task = queue.lease(worker_id)
+        if task is None:
+            seeded_at = queue.seeded_at()
+            if seeded_at is not None and queue.is_drained():
+                if joined or seeded_at >= started:
+                    break
+            elif seeded_at is not None:
+                joined = True
+            # Not seeded yet, or other workers hold leases that may spawn more work
+            time.sleep(idle_wait)
+            continue
+        
+        joined = True
+        task_id, kind, payload = task
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat_loop, args=(queue, task_id, worker_id, stop), daemon=True)
+        beat.start()
+        requests_before, started = HOST_HEALTH.requests, time.monotonic()
+        try:
+            process_task(queue, kind, payload)
+            queue.complete(task_id, worker_id)
+            processed += 1
+        except TenantDeferred as e:
+            print(f"  ⏸  Task {task_id} deferred: {e}")
+            queue.defer(task_id, worker_id, e.retry_at)
+        except Exception as e:
+            print(f"✗ Task {task_id} ({kind}) failed: {e}")
+            queue.fail(task_id, worker_id, e)
+        finally:
+            stop.set()
+            beat.join()
+            # Successful or not, the attempt's cost goes into the tenant's history
+            queue.add_cost(payload['base_domain'], HOST_HEALTH.requests - requests_before,
+                           time.monotonic() - started)
+    
+    print(f"✓ Worker {worker_id} done - processed {processed} tasks")
+
+
+def main(argv=None):
     """Scrape multiple Avature sites and save to JSON"""
+    parser = argparse.ArgumentParser(description="Avature multi-site scraper")
+    parser.add_argument('--mode', choices=['local', 'coordinator', 'worker'], default='local',
+                        help="local: single process; coordinator/worker: shared queue crawl")
+    parser.add_argument('--queue', default='data/crawl_queue.db', help="Shared SQLite queue path")
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument('--urls', default="data/avature_urls_clean.txt")
+    parser.add_argument('--output', default="data/all_jobs.json")
+    parser.add_argument('--max-requests', type=int, default=None, help="Request budget for local mode")
+    parser.add_argument('--time-budget', type=float, default=None, metavar='MINUTES',
+                        help="Stop starting new sites after this many minutes")
+    parser.add_argument('--plan', action='store_true', help="Print the crawl schedule and exit")
+    parser.add_argument('--history', default=HISTORY_FILE, help="Per-tenant crawl history file")
+    parser.add_argument('--profiles', default=PROFILE_CACHE_FILE,
+                        help="Learned per-tenant selector cache (can be shared by workers)")
+    parser.add_argument('--profile', nargs='?', const='profile', default=None, metavar='DIR',
+                        help="Profile stages and write reports to DIR (default: profile/)")
+    args = parser.parse_args(argv)
+    use_profile_cache(args.profiles)
+    
+    with profiling.session(args.profile), connect_stages(args.profile is not None):
+        if args.mode == 'coordinator':
+            run_coordinator(args.queue, args.urls, args.output, history_file=args.history)
+        elif args.mode == 'worker':
+            run_worker(args.queue, args.worker_id)
+        else:
+            run_local(args.urls, args.output, args.max_requests, args.time_budget, args.plan, args.history)
+
+
+def run_local(url_file, output_file, max_requests=None, time_budget=None, plan_only=False,
+              history_file=HISTORY_FILE):
+    """
+    Scrape sites from url_file in this process and save to JSON.
+    
+    Sites are crawled in order of expected new jobs per request (see
+    scheduler.py), stopping once max_requests or time_budget (minutes)
+    is spent. With plan_only, the schedule is printed and nothing is
+    fetched.
+    """
     print("=" * 70)
     print("AVATURE MULTI-SITE SCRAPER - PHASE 2")
     print("=" * 70)
     
     # Read URLs from cleaned list
-    url_file = "data/avature_urls_clean.txt"
-    output_file = "data/all_jobs.json"
-    
     print(f"\nReading URLs from {url_file}...")
-    with open(url_file, 'r') as f:
-        all_urls = [line.strip() for line in f if line.strip()]
+    all_urls = read_urls(url_file)
     
     print(f"Found {len(all_urls)} sites to scrape")
     
@@ -225,21 +702,57 @@ def main():
         print(f"\n🚀 FULL SCRAPE MODE: Scraping all {len(all_urls)} sites")
         print("This will take several hours. Progress is saved after each site.")
     
+    # Order sites by expected yield from past crawls
+    history = load_history(history_file)
+    plan = build_schedule(all_urls, history, max_requests,
+                          time_budget * 60 if time_budget is not None else None)
+    print_schedule(plan, limit=None if plan_only else 20)
+    if plan_only:
+        return
+    all_urls = [item['tenant'] for item in plan]
+    
     # Track statistics
     all_jobs = []
     successful_sites = 0
     failed_sites = 0
     
-    # Scrape each site
+    # Scrape each site - tenants whose circuit opens are retried at the end,
+    # resuming from the jobs already collected. A retry that made progress
+    # (a slow host still answers) earns another; one that made none is final.
     start_time = datetime.now()
-    
-    for idx, url in enumerate(all_urls, 1):
+    work = deque((url, None, None, 0) for url in all_urls)   # (url, retry_at, partial jobs, next page)
+    spent = Counter()           # requests per tenant, across deferred attempts
+    spent_seconds = Counter()
+    deferred_sites = 0
+    idx = 0
+    
+    while work:
+        if max_requests is not None and HOST_HEALTH.requests >= max_requests:
+            print(f"\n⏹  Request budget of {max_requests} spent - stopping")
+            break
+        if time_budget is not None and (datetime.now() - start_time).total_seconds() > time_budget * 60:
+            print(f"\n⏹  Time budget of {time_budget} minutes spent - stopping")
+            break
+        
+        url, retry_at, partial, next_page = work.popleft()
+        idx += 1
         print(f"\n{'='*70}")
-        print(f"Site {idx}/{len(all_urls)}")
+        print(f"Site {idx}/{len(all_urls) + deferred_sites}" + (" (deferred retry)" if retry_at else ""))
         print(f"{'='*70}")
         
+        if retry_at and retry_at > time.time():
+            wait_seconds = retry_at - time.time()
+            print(f"Waiting {wait_seconds:.0f}s for circuit cooldown...")
+            time.sleep(wait_seconds)
+        
+        requests_before, started = HOST_HEALTH.requests, time.monotonic()
+        progress_before = _progress(partial)
         try:
-            jobs = scrape_single_site(url)
+            jobs = scrape_single_site(url, partial, next_page)
+            spent[url] += HOST_HEALTH.requests - requests_before
+            spent_seconds[url] += time.monotonic() - started
+            record_crawl(history, url, jobs, spent[url], spent_seconds[url])
+            save_history(history, history_file)
             
             if jobs:
                 all_jobs.extend(jobs)
@@ -249,9 +762,33 @@ def main():
                 failed_sites += 1
                 print(f"✗ No jobs found or site failed")
                 
+        except TenantDeferred as e:
+            spent[url] += HOST_HEALTH.requests - requests_before
+            spent_seconds[url] += time.monotonic() - started
+            if retry_at is None or _progress(e.jobs) > progress_before:
+                deferred_sites += 1
+                work.append((url, e.retry_at, e.jobs, e.next_page))
+                kept = f" - keeping {len(e.jobs)} jobs, {_fetched(e.jobs)} with details" if e.jobs else ""
+                print(f"⏸  Deferred: {e}{kept}")
+                continue
+            print(f"✗ Still failing after retry: {e}")
+            fetched = _fetched(e.jobs)
+            jobs = _finish_partial(e.jobs)
+            record_crawl(history, url, jobs, spent[url], spent_seconds[url])
+            save_history(history, history_file)
+            if not jobs:
+                failed_sites += 1
+                continue
+            all_jobs.extend(jobs)
+            successful_sites += 1
+            print(f"✓ Kept {len(jobs)} jobs ({fetched} with descriptions)")
         except Exception as e:
             failed_sites += 1
             print(f"✗ Error scraping site: {e}")
+            spent[url] += HOST_HEALTH.requests - requests_before
+            spent_seconds[url] += time.monotonic() - started
+            record_crawl(history, url, [], spent[url], spent_seconds[url])
+            save_history(history, history_file)
             continue
         
         # Save progress after each site
@@ -260,6 +797,17 @@ def main():
         # Show running totals
         print(f"\nRunning totals: {len(all_jobs)} jobs from {successful_sites} sites")
     
+    # Budget ran out with deferred tenants still queued - keep what they collected
+    for url, _, partial, _ in work:
+        jobs = _finish_partial(partial)
+        if jobs:
+            all_jobs.extend(jobs)
+            successful_sites += 1
+            record_crawl(history, url, jobs, spent[url], spent_seconds[url])
+    if any(partial for _, _, partial, _ in work):
+        save_history(history, history_file)
+        save_jobs_to_json(all_jobs, output_file)
+    
     # Final summary
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds() / 60
@@ -267,37 +815,62 @@ def main():
     print("\n" + "=" * 70)
     print("SCRAPING COMPLETE")
     print("=" * 70)
-    print(f"Total sites attempted: {len(all_urls)}")
+    print(f"Total sites attempted: {idx - deferred_sites}/{len(all_urls)}")
     print(f"Successful sites: {successful_sites}")
     print(f"Failed sites: {failed_sites}")
+    print(f"Deferred by circuit breaker: {deferred_sites}")
     print(f"Total jobs scraped: {len(all_jobs)}")
     print(f"Time taken: {duration:.1f} minutes")
     print(f"Output saved to: {output_file}")
     
     # Show sample jobs from different companies
     if all_jobs:
-        unique_companies = list(set(j['company_domain'] for j in all_jobs))[:3]
+        unique_companies = list(set(j.company_domain for j in all_jobs))[:3]
         print(f"\n📋 Sample jobs from {len(unique_companies)} companies:")
         for company in unique_companies:
-            company_jobs = [j for j in all_jobs if j['company_domain'] == company]
+            company_jobs = [j for j in all_jobs if j.company_domain == company]
             if company_jobs:
                 sample = company_jobs[0]
                 print(f"\n  {company}:")
-                print(f"    • {sample['title']}")
-                print(f"    • {sample['location']}")
+                print(f"    • {sample.title}")
+                print(f"    • {sample.location}")
 
 
-def save_jobs_to_json(jobs, output_file):
-    """Save jobs list to JSON file"""
-    output_data = {
+def _fetched(jobs):
+    """Number of jobs whose details have been fetched"""
+    return sum(1 for job in jobs or () if job.description is not None)
+
+
+def _progress(jobs):
+    """Listings plus details collected for a tenant so far"""
+    return len(jobs or ()) + _fetched(jobs)
+
+
+def _finish_partial(jobs):
+    """Mark jobs left unfinished by a deferred tenant and return them"""
+    for job in jobs or ():
+        if job.description is None:
+            job.description = "Description unavailable - circuit open"
+    return list(jobs or ())
+
+
+def save_jobs_to_json(jobs, output_file, boilerplate=None):
+    """
+    Save Job records to JSON file.
+    
+    Descriptions may contain {{boilerplate:<id>}} references; the shared
+    blocks are written once under "boilerplate" (defaults to this
+    process's store). Use text_normalize.rebuild_description to expand.
+    """
+    header = {
         "scrape_date": datetime.now().isoformat(),
         "total_jobs": len(jobs),
-        "total_companies": len(set(j['company_domain'] for j in jobs)),
-        "jobs": jobs
+        "total_companies": len(set(j.company_domain for j in jobs)),
+        "boilerplate": BOILERPLATE.blocks if boilerplate is None else boilerplate,
     }
     
-    with open(output_file, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    with open(output_file, 'w') as f, profiling.stage('json_dump'):
+        write_jobs_json(jobs, f, header)
 
 
 if __name__ == "__main__":
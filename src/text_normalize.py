@@ -0,0 +1,134 @@
+"""
+Description text normalization and boilerplate deduplication.
+
+normalize_blocks() walks a description element once, collapsing
+whitespace and dropping markup, scripts and comments, and yields one
+clean text block per paragraph-level element. This replaces
+get_text(separator='\\n', strip=True), which built the full string and
+kept every stray line break.
+
+BoilerplateStore then replaces blocks that repeat within a tenant (EEO
+statements, benefits blurbs, "About us") with a short reference:
+
+    {{boilerplate:3f9a1c0e5b7d2a64}}
+
+The first occurrence stays inline; from the second occurrence on the
+block is stored once in the output's top-level "boilerplate" table.
+rebuild_description() expands the references back into the full text.
+"""
+
+import hashlib
+import re
+
+
+MIN_BOILERPLATE_CHARS = 80      # shorter blocks aren't worth a reference
+REFERENCE_PATTERN = re.compile(r'\{\{boilerplate:([0-9a-f]{16})\}\}')
+
+BLOCK_TAGS = {
+    'address', 'article', 'blockquote', 'dd', 'div', 'dl', 'dt', 'footer',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'li', 'ol', 'p', 'pre',
+    'section', 'table', 'td', 'th', 'tr', 'ul',
+}
+BREAK_TAGS = {'br', 'hr'}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_blocks(element):
+    """
+    Yield whitespace-normalized text blocks from an element in one pass.
+
+    Text is grouped by its nearest block-level ancestor, so a new block
+    starts whenever that ancestor changes (including tail text after a
+    nested list) and at every <br>/<hr>. Empty blocks are skipped.
+    """
+    # bs4 is imported here so rebuild_description (used by export) stays light
+    from bs4 import Comment, NavigableString, Tag
+
+    parts = []
+    current = None
+    for node in element.descendants:
+        if isinstance(node, Tag):
+            if node.name in BREAK_TAGS and parts:
+                yield from _flush(parts)
+                parts = []
+            continue
+        if isinstance(node, Comment) or not isinstance(node, NavigableString):
+            continue
+        parent = node.parent
+        if parent.name in SKIP_TAGS:
+            continue
+        while parent is not element and parent.name not in BLOCK_TAGS:
+            parent = parent.parent
+        if parent is not current:
+            yield from _flush(parts)
+            parts = []
+            current = parent
+        parts.append(node)
+
+    yield from _flush(parts)
+
+
+def _flush(parts):
+    block = WHITESPACE.sub(' ', ''.join(parts)).strip()
+    if block:
+        yield block
+
+
+def normalize_text(element):
+    """Clean text of an element, one block per line"""
+    return '\n'.join(normalize_blocks(element))
+
+
+def block_id(text):
+    """Stable 16 hex digit id for a text block"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class BoilerplateStore:
+    """
+    Tracks blocks per tenant and stores the repeated ones once.
+
+    Only an 8-byte hash is kept per distinct block seen; full text is
+    kept only for blocks that actually repeat.
+    """
+
+    def __init__(self, min_chars=MIN_BOILERPLATE_CHARS):
+        self.min_chars = min_chars
+        self.blocks = {}        # id → text, for blocks seen twice in some tenant
+        self.seen = {}          # tenant → set of ids seen once
+
+    def dedupe(self, text, tenant):
+        """
+        Replace repeated blocks of a normalized description with references.
+
+        Args:
+            text: Normalized description (one block per line)
+            tenant: Tenant the description came from
+
+        Returns:
+            The description with repeated blocks replaced by references
+        """
+        seen = self.seen.setdefault(tenant, set())
+        lines = []
+        for block in text.split('\n'):
+            if len(block) < self.min_chars:
+                lines.append(block)
+                continue
+            bid = block_id(block)
+            # Already stored (possibly by another tenant) or second sighting here
+            if bid in self.blocks or bid in seen:
+                self.blocks.setdefault(bid, block)
+                seen.add(bid)
+                lines.append(f"{{{{boilerplate:{bid}}}}}")
+            else:
+                seen.add(bid)
+                lines.append(block)
+        return '\n'.join(lines)
+
+
+def rebuild_description(text, blocks):
+    """Expand boilerplate references using the output's boilerplate table"""
+    if not text:
+        return text
+    return REFERENCE_PATTERN.sub(lambda m: blocks.get(m.group(1), m.group(0)), text)
@@ -1,8 +1,8 @@
 import requests
 
 # Test if Google discovery domains are valid or not
-def get_valid_domains():
-    with open('data/domain_discovery.txt', 'r') as f:
+def get_valid_domains(input_file='data/domain_discovery.txt', output_file='data/discover_valid_domains.txt'):
+    with open(input_file, 'r') as f:
         read_domains = f.readlines()
         valid_domains = []
         invalid_domains = []
@@ -24,7 +24,7 @@ def get_valid_domains():
             except requests.RequestException as e:
                 print(f'Error: {get_domains} - {e}')
                 invalid_domains.append(get_domains)
-    with open('data/discover_valid_domains.txt', 'w') as f:
+    with open(output_file, 'w') as f:
         for domain in valid_domains:
             f.write(domain + '\n')
     print(f"\n✓ Found {len(valid_domains)} valid domains")
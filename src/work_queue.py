@@ -0,0 +1,256 @@
+"""
+Shared crawl work queue for distributed (coordinator/worker) scraping.
+
+Backed by a single SQLite file, so any number of worker processes - on one
+machine or on several nodes sharing a volume - can lease tasks from it.
+
+- Tasks are leased for a fixed time; workers extend the lease with
+  heartbeats while they work on it.
+- A lease that expires (worker died or hung) is put back to pending the
+  next time anyone asks for work, up to MAX_ATTEMPTS.
+- A task whose tenant's circuit breaker is open is deferred: released
+  without using up an attempt and hidden until the cooldown ends.
+- Results are keyed by (company domain, detail URL) and written with
+  INSERT OR REPLACE, so a task re-run after a lost lease cannot create
+  duplicates.
+- The coordinator marks the queue as seeded once all tenants are in;
+  until then an empty queue means "not started yet", not "finished".
+- Starting the coordinator on a queue whose previous run finished clears
+  that run's tasks, jobs and costs, so the file can be reused; a run that
+  never finished (coordinator restarted) is resumed instead.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+from models import Job
+
+
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (kind, payload)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+CREATE TABLE IF NOT EXISTS jobs (
+    company_domain TEXT NOT NULL,
+    detail_url TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (company_domain, detail_url)
+);
+CREATE TABLE IF NOT EXISTS boilerplate (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tenant_costs (
+    base_domain TEXT PRIMARY KEY,
+    requests INTEGER NOT NULL DEFAULT 0,
+    seconds REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class WorkQueue:
+    """
+    SQLite-backed task queue with leases.
+
+    A fresh connection is opened per call so the object can be shared by a
+    worker's main loop and its heartbeat thread.
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(self, kind, payload):
+        """Add a task; enqueueing the same (kind, payload) twice is a no-op"""
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR IGNORE INTO tasks (kind, payload) VALUES (?, ?)",
+                         (kind, json.dumps(payload, sort_keys=True)))
+
+    def lease(self, worker_id):
+        """
+        Lease the next pending task, re-queueing expired leases first.
+
+        Returns:
+            (task_id, kind, payload) or None if nothing is pending
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                    "worker = NULL, error = 'lease expired' "
+                    "WHERE status = 'leased' AND lease_expires < ?",
+                    (self.max_attempts, now))
+                row = conn.execute(
+                    "SELECT id, kind, payload FROM tasks WHERE status = 'pending' AND available_at <= ? "
+                    "ORDER BY id LIMIT 1", (now,)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (worker_id, now + self.lease_seconds, row[0]))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def heartbeat(self, task_id, worker_id):
+        """Extend a lease; returns False if the worker no longer holds it"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, task_id, worker_id))
+            return cursor.rowcount == 1
+
+    def complete(self, task_id, worker_id):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE tasks SET status = 'done', error = NULL WHERE id = ? AND worker = ?",
+                         (task_id, worker_id))
+
+    def fail(self, task_id, worker_id, error):
+        """Release a task after an error - retried until max_attempts"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, error = ? WHERE id = ? AND worker = ?",
+                (self.max_attempts, str(error), task_id, worker_id))
+
+    def defer(self, task_id, worker_id, available_at):
+        """Release a task without counting an attempt, hidden until available_at"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL, attempts = attempts - 1, "
+                "available_at = ?, error = 'deferred' WHERE id = ? AND worker = ?",
+                (available_at, task_id, worker_id))
+
+    def save_jobs(self, jobs):
+        """Idempotently store Job records, keyed by domain and detail URL"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO jobs (company_domain, detail_url, data) VALUES (?, ?, ?)",
+                [(job.company_domain, job.detail_url, json.dumps(job.to_dict())) for job in jobs])
+            conn.execute("COMMIT")
+
+    def add_cost(self, base_domain, requests_made, seconds):
+        """Add the requests and time a task attempt spent to its tenant's totals"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO tenant_costs (base_domain, requests, seconds) VALUES (?, ?, ?) "
+                "ON CONFLICT (base_domain) DO UPDATE SET requests = requests + excluded.requests, "
+                "seconds = seconds + excluded.seconds",
+                (base_domain, requests_made, seconds))
+
+    def load_costs(self):
+        """Return base_domain → (requests, seconds) spent across all workers"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT base_domain, requests, seconds FROM tenant_costs").fetchall()
+        return {base_domain: (requests_made, seconds) for base_domain, requests_made, seconds in rows}
+
+    def save_boilerplate(self, blocks):
+        """Store shared description blocks (id → text); existing ids are kept"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR IGNORE INTO boilerplate (id, text) VALUES (?, ?)",
+                             list(blocks.items()))
+            conn.execute("COMMIT")
+
+    def load_boilerplate(self):
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT id, text FROM boilerplate").fetchall())
+
+    def load_jobs(self):
+        """Return all stored jobs as Job records"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT data FROM jobs ORDER BY company_domain, rowid").fetchall()
+        return [Job.from_dict(json.loads(row[0])) for row in rows]
+
+    def counts(self):
+        """Return a dict of task status → count"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return dict(rows)
+
+    def begin_run(self):
+        """
+        Prepare the queue for a new coordinator run.
+
+        A finished previous run (seeded, nothing pending or leased) is
+        cleared - otherwise its done tasks would block re-enqueueing and
+        its jobs and costs would be reported again. An unfinished run is
+        kept so it can be resumed. Either way the queue is unseeded until
+        the coordinator calls mark_seeded().
+
+        Returns:
+            True if a finished run was cleared
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            seeded = conn.execute("SELECT 1 FROM meta WHERE key = 'seeded_at'").fetchone() is not None
+            active = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0]
+            cleared = seeded and not active
+            if cleared:
+                for table in ('tasks', 'jobs', 'tenant_costs', 'boilerplate'):
+                    conn.execute(f"DELETE FROM {table}")
+            conn.execute("DELETE FROM meta WHERE key = 'seeded_at'")
+            conn.execute("COMMIT")
+        return cleared
+
+    def mark_seeded(self, seeded=True):
+        """Record that the coordinator has (or, with False, has not yet) enqueued all tenants"""
+        with closing(self._connect()) as conn:
+            if seeded:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded_at', ?)",
+                             (str(time.time()),))
+            else:
+                conn.execute("DELETE FROM meta WHERE key = 'seeded_at'")
+
+    def seeded_at(self):
+        """Time the current run finished seeding, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'seeded_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def is_seeded(self):
+        return self.seeded_at() is not None
+
+    def is_drained(self):
+        """True once no task is pending or leased"""
+        counts = self.counts()
+        return counts.get('pending', 0) == 0 and counts.get('leased', 0) == 0
+
+    def is_finished(self):
+        """True once the queue has been seeded and then drained"""
+        return self.is_seeded() and self.is_drained()
@@ -0,0 +1,10 @@
+"""
+Put src/ on sys.path so tests import modules by their plain names, the
+same way the modules import each other (`from models import Job`).
+Importing them as `src.models` as well would load a second copy of each.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
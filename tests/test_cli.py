@@ -0,0 +1,86 @@
+"""cli.py export and lazy subcommand imports"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from models import Job, write_jobs_json
+from text_normalize import block_id
+
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+DESCRIPTION = "We are an equal opportunity employer. " * 4
+REFERENCE = f"{{{{boilerplate:{block_id(DESCRIPTION)}}}}}"
+
+
+@pytest.fixture
+def all_jobs(tmp_path):
+    """An all_jobs.json whose second description references a boilerplate block"""
+    jobs = [
+        Job("Engineer", "https://acme.avature.net/careers/JobDetail/1", "Remote", DESCRIPTION,
+            "acme.avature.net", date_posted="2026-01-05"),
+        Job("Analyst, Data", "https://acme.avature.net/careers/JobDetail/2",
+            description=REFERENCE, company_domain="acme.avature.net"),
+    ]
+    path = tmp_path / 'all_jobs.json'
+    with open(path, 'w') as f:
+        write_jobs_json(jobs, f, {'total_jobs': 2, 'boilerplate': {block_id(DESCRIPTION): DESCRIPTION}})
+    return path
+
+
+def test_export_jsonl_round_trip(all_jobs, tmp_path):
+    out = tmp_path / 'jobs.jsonl'
+    cli.main(['export', '--input', str(all_jobs), '--output', str(out)])
+    with open(out) as f:
+        rows = [json.loads(line) for line in f]
+    with open(all_jobs) as f:
+        source = json.load(f)['jobs']
+
+    assert [Job.from_dict(row).to_dict() for row in rows] == rows
+    assert rows[0] == source[0]
+    assert rows[1] == {**source[1], 'description': DESCRIPTION}
+
+
+def test_export_csv(all_jobs, tmp_path):
+    out = tmp_path / 'jobs.csv'
+    cli.main(['export', '--input', str(all_jobs), '--output', str(out), '--format', 'csv'])
+    with open(out, newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    assert list(rows[0]) == list(Job.FIELDS)
+    assert [row['title'] for row in rows] == ["Engineer", "Analyst, Data"]
+    assert rows[1]['description'] == DESCRIPTION
+    assert rows[1]['job_id'] == '2'
+
+
+def test_unknown_option_is_rejected_outside_scrape(all_jobs, tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main(['export', '--input', str(all_jobs), '--output', str(tmp_path / 'x'), '--bogus'])
+
+
+@pytest.mark.parametrize('argv', [
+    ['--help'],
+    ['export', '--help'],
+    ['export', '--input', '{all_jobs}', '--output', '{out}'],
+])
+def test_light_commands_do_not_import_http_or_html_libraries(argv, all_jobs, tmp_path):
+    argv = [arg.format(all_jobs=all_jobs, out=tmp_path / 'jobs.jsonl') for arg in argv]
+    code = (
+        "import sys\n"
+        "import cli\n"
+        "try:\n"
+        f"    cli.main({argv!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "heavy = {'requests', 'bs4', 'lxml', 'urllib3'} & set(sys.modules)\n"
+        "print(sorted(heavy))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=SRC, capture_output=True,
+                            text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == '[]'
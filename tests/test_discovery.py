@@ -0,0 +1,117 @@
+"""Merge, dedupe, validation and per-source reports of src/discovery.py"""
+
+import os
+
+import discovery
+import dns_enumeration
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'discovery')
+PATHS = {
+    'known': os.path.join(FIXTURES, 'known.txt'),
+    'starter_pack': os.path.join(FIXTURES, 'starter.txt'),
+    'ct_logs': os.path.join(FIXTURES, 'crt.json'),
+    'google': os.path.join(FIXTURES, 'google.txt'),
+    'company_names': os.path.join(FIXTURES, 'companies.txt'),
+}
+
+# Names the stub DNS "resolves"; testa is resolved but filtered (contains "test")
+RESOLVES = {'hooli.avature.net', 'testa.avature.net', 'nike.avature.net'}
+# Every domain has a careers page except umbrella
+INVALID = {'umbrella.avature.net'}
+
+
+def stub_resolver(domain):
+    return domain in RESOLVES
+
+
+def stub_validator(domain):
+    return domain not in INVALID
+
+
+def run(paths=PATHS, validator=stub_validator):
+    known = discovery.load_existing_domains(paths['known'])
+    sources = discovery.build_sources(paths, known, resolver=stub_resolver)
+    valid, reports = discovery.discover(sources, known, validator=validator)
+    return valid, {r['source']: r for r in reports}
+
+
+def test_merges_sources_and_drops_known_filtered_and_invalid():
+    valid, _ = run()
+    assert valid == ['acme.avature.net', 'globex.avature.net',
+                     'hooli.avature.net', 'initech.avature.net']
+
+
+def test_each_new_domain_counted_once_across_sources():
+    _, reports = run()
+    # acme (starter + crt) and globex (starter + google) are reported twice
+    # but only new for one source
+    new_domains = {'acme', 'globex', 'initech', 'umbrella', 'hooli'}
+    assert sum(r['new'] for r in reports.values()) == len(new_domains)
+    assert sum(r['valid'] for r in reports.values()) == len(new_domains) - 1
+
+
+def test_per_source_reports():
+    _, reports = run()
+    assert set(reports) == {'starter_pack', 'ct_logs', 'google', 'dns'}
+    assert reports['starter_pack']['found'] == 3
+    assert reports['ct_logs']['found'] == 3          # sandbox and wildcard dropped
+    assert reports['google']['found'] == 2           # uat host dropped
+    assert reports['dns']['found'] == 2              # hooli, testa
+    assert reports['dns']['new'] == 1                # testa filtered
+    assert reports['dns']['valid'] == 1
+    for r in reports.values():
+        assert r['error'] is None
+        # One validation request per new domain on top of the source's own cost
+        assert r['requests'] >= r['new']
+    assert reports['ct_logs']['requests'] == reports['ct_logs']['new']
+
+
+def test_validator_sees_each_new_domain_once():
+    calls = []
+
+    def validator(domain):
+        calls.append(domain)
+        return True
+
+    valid, _ = run(validator=validator)
+    assert sorted(calls) == sorted(set(calls))
+    assert len(valid) == 5
+
+
+def test_failing_source_is_reported_not_raised():
+    paths = {**PATHS, 'ct_logs': os.path.join(FIXTURES, 'missing.json')}
+    valid, reports = run(paths)
+    assert reports['ct_logs']['error']
+    assert reports['ct_logs']['found'] == 0
+    # acme still comes from the starter pack; initech was only in crt.sh
+    assert valid == ['acme.avature.net', 'globex.avature.net', 'hooli.avature.net']
+
+
+def test_dns_enumeration_limit_looks_up_only_the_top_candidates(monkeypatch):
+    known = dns_enumeration.load_existing_domains(PATHS['known'])
+    with open(PATHS['company_names']) as f:
+        ranked = dns_enumeration.generate_candidates([line.strip() for line in f], known)
+    looked_up = []
+    monkeypatch.setattr(dns_enumeration, 'load_existing_domains', lambda: known)
+    monkeypatch.setattr(dns_enumeration, 'dns_lookup',
+                        lambda domain: looked_up.append(domain) or stub_resolver(domain))
+    monkeypatch.setattr(dns_enumeration, 'validate_careers_page', stub_validator)
+    monkeypatch.setattr(dns_enumeration, 'sleep', lambda seconds: None)
+
+    new = dns_enumeration.enumerate_domains(PATHS['company_names'], limit=3)
+    assert looked_up == ranked[:3]
+    assert set(new) <= RESOLVES - known
+
+    looked_up.clear()
+    new = dns_enumeration.enumerate_domains(PATHS['company_names'])
+    assert looked_up == ranked
+    # nike is already known, so every domain returned is new
+    assert sorted(new) == ['hooli.avature.net', 'testa.avature.net']
+
+
+def test_missing_starter_pack_is_skipped():
+    paths = {**PATHS, 'starter_pack': os.path.join(FIXTURES, 'missing.txt')}
+    valid, reports = run(paths)
+    assert set(reports) == {'ct_logs', 'google', 'dns'}
+    assert valid == run()[0]
@@ -0,0 +1,102 @@
+"""Label matching, job ids and profile learning in src/extraction.py"""
+
+from bs4 import BeautifulSoup
+
+from extraction import (FIELD_CANDIDATES, MAX_MISSES, ProfileCache, TenantProfile,
+                            extract_field, trial_extract)
+from models import looks_like_job_id
+
+
+NO_SELECTORS = {field: None for field in FIELD_CANDIDATES}
+
+
+def field(label, value):
+    return (f'<div class="article__content__view__field">'
+            f'<div class="article__content__view__field__label">{label}</div>'
+            f'<div class="article__content__view__field__value">{value}</div></div>')
+
+
+def page(*fields):
+    return BeautifulSoup(f'<article>{"".join(fields)}</article>', 'lxml')
+
+
+def test_label_matches_whole_words_only():
+    soup = page(field('Preferred Qualifications', '5 years Python'))
+    assert extract_field(soup, 'job_id', 'label:Reference', 'https://x') is None
+    assert extract_field(soup, 'date_posted', 'label:Posted', 'https://x') is None
+
+
+def test_label_matches_longer_label_text():
+    soup = page(field('Preferred Qualifications', '5 years Python'),
+                field('Reference Number:', 'REQ-2024-0012'))
+    assert extract_field(soup, 'job_id', 'label:Reference', 'https://x') == 'REQ-2024-0012'
+
+
+def test_trial_extract_ignores_prose_labels():
+    soup = page(field('Preferred Qualifications', '5 years Python'))
+    values, _ = trial_extract(soup, 'https://x')
+    assert values['job_id'] is None
+
+
+def test_looks_like_job_id():
+    for value in ('12345', 'REQ-2024-0012', 'JR_88121'):
+        assert looks_like_job_id(value)
+    for value in (None, '', '5 years Python', 'Engineering', 'https://x/1'):
+        assert not looks_like_job_id(value)
+
+
+def test_learned_selector_miss_falls_back_to_other_candidates():
+    profile = TenantProfile('acme', {**NO_SELECTORS, 'job_id': 'label:Job ID'})
+    values = profile.extract(page(field('Reference', 'REQ-7')), 'https://x')
+    assert values['job_id'] == 'REQ-7'
+    assert profile.misses == 1
+
+
+def test_repeated_misses_reset_profile_to_learning():
+    profile = TenantProfile('acme', {**NO_SELECTORS, 'job_id': 'label:Job ID'}, stop_early=True)
+    for _ in range(MAX_MISSES):
+        profile.extract(page(field('Reference', 'REQ-7')), 'https://x')
+    assert not profile.learned
+    assert not profile.stop_early
+
+
+def test_hit_resets_miss_count():
+    profile = TenantProfile('acme', {**NO_SELECTORS, 'job_id': 'label:Job ID'})
+    profile.extract(page(field('Reference', 'REQ-7')), 'https://x')
+    profile.extract(page(field('Job ID', '42')), 'https://x')
+    assert profile.misses == 0
+
+
+def test_all_none_profiles_are_not_persisted(tmp_path):
+    path = str(tmp_path / 'profiles.json')
+    cache = ProfileCache(path)
+    cache.get('empty').selectors = dict(NO_SELECTORS)
+    cache.get('acme').selectors = {**NO_SELECTORS, 'job_id': 'label:Job ID'}
+    cache.save()
+
+    reloaded = ProfileCache(path)
+    assert set(reloaded.profiles) == {'acme'}
+    assert not reloaded.get('empty').learned
+
+
+def test_save_merges_profiles_learned_by_other_workers(tmp_path):
+    path = str(tmp_path / 'profiles.json')
+    worker_a, worker_b = ProfileCache(path), ProfileCache(path)
+    worker_a.get('acme').selectors = {**NO_SELECTORS, 'job_id': 'label:Job ID'}
+    worker_a.save()
+    worker_b.get('globex').selectors = {**NO_SELECTORS, 'job_id': 'label:Reference'}
+    worker_b.save()
+
+    assert set(ProfileCache(path).profiles) == {'acme', 'globex'}
+
+
+def test_save_drops_profiles_sent_back_to_learning(tmp_path):
+    path = str(tmp_path / 'profiles.json')
+    cache = ProfileCache(path)
+    cache.get('acme').selectors = {**NO_SELECTORS, 'job_id': 'label:Job ID'}
+    cache.save()
+
+    reloaded = ProfileCache(path)
+    reloaded.get('acme').relearn()
+    reloaded.save()
+    assert ProfileCache(path).profiles == {}
@@ -0,0 +1,108 @@
+"""Streaming limits of fetch_page: byte cap, stop markers and total deadline"""
+
+import socketserver
+import threading
+import time
+
+import pytest
+import urllib3
+
+import profiling
+import scraper
+
+
+def http_head(length):
+    return (f"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {length}\r\nConnection: close\r\n\r\n").encode()
+
+
+@pytest.fixture
+def serve():
+    """Start a local server whose handler(sock) writes the raw response"""
+    servers = []
+
+    def start(handler):
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.recv(65536)
+                try:
+                    handler(self.request)
+                except OSError:
+                    pass        # client gave up
+
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_trickling_host_is_cut_off_at_deadline(serve):
+    def trickle(sock):
+        sock.sendall(http_head(1000))
+        for _ in range(1000):
+            sock.sendall(b'x')
+            time.sleep(0.2)
+
+    url = serve(trickle)
+    started = time.monotonic()
+    assert scraper.fetch_page(url, deadline=1) is None
+    assert time.monotonic() - started < 2
+
+
+def test_silent_host_is_cut_off_at_deadline(serve):
+    def silent(sock):
+        sock.sendall(http_head(1000) + b'x')
+        time.sleep(5)
+
+    url = serve(silent)
+    started = time.monotonic()
+    assert scraper.fetch_page(url, deadline=1) is None
+    assert time.monotonic() - started < 2
+
+
+def test_body_is_capped_at_max_bytes(serve):
+    body = b'a' * 200_000
+    url = serve(lambda sock: sock.sendall(http_head(len(body)) + body))
+    html = scraper.fetch_page(url, max_bytes=50_000)
+    assert len(html) == 50_000
+
+
+def test_reading_stops_after_stop_marker(serve):
+    head = b'<html><div class="article__content__view__field">Job text</div></article>'
+
+    def endless(sock):
+        sock.sendall(http_head(10_000_000) + head)
+        for _ in range(100):
+            sock.sendall(b'<p>more</p>' * 100)
+            time.sleep(0.1)
+
+    url = serve(endless)
+    started = time.monotonic()
+    html = scraper.fetch_page(url, stop_markers=scraper.DESCRIPTION_MARKERS)
+    assert html.startswith(head.decode())
+    assert time.monotonic() - started < 2
+
+
+def test_complete_body_is_returned(serve):
+    body = '<html><p>Café</p></html>'.encode()
+    url = serve(lambda sock: sock.sendall(http_head(len(body)) + body))
+    assert scraper.fetch_page(url) == '<html><p>Café</p></html>'
+
+
+def test_profiled_fetch_times_dns_and_tcp_connect_separately(serve, tmp_path):
+    url = serve(lambda sock: sock.sendall(http_head(5) + b'hello'))
+    url = url.replace('127.0.0.1', 'localhost')
+    with profiling.session(str(tmp_path)) as profiler, scraper.connect_stages():
+        assert scraper.fetch_page(url) == 'hello'
+
+    assert profiler.timings['dns'][0] == 1
+    # localhost may resolve to ::1 first, which is refused before 127.0.0.1
+    assert profiler.timings['tcp_connect'][0] >= 1
+    assert profiler.timings['connect'][0] == profiler.timings['download'][0] == 1
+    assert urllib3.util.connection.create_connection is scraper._create_connection
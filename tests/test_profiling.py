@@ -0,0 +1,58 @@
+"""Stage timings and report files written by profiling.session"""
+
+import os
+import time
+
+import profiling
+
+
+REPORTS = ['stages.txt', 'stacks.collapsed', 'allocations.txt', 'cprofile.pstats']
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_session_writes_all_reports(tmp_path):
+    out = tmp_path / 'profile'
+    with profiling.session(str(out)) as profiler:
+        for _ in range(3):
+            with profiling.stage('parse'):
+                busy(0.02)
+        with profiling.stage('extract'):
+            busy(0.01)
+
+    assert sorted(os.listdir(out)) == sorted(REPORTS)
+    assert profiler.timings['parse'][0] == 3
+    assert profiler.timings['parse'][1] >= 0.06
+
+    stages = (out / 'stages.txt').read_text().splitlines()
+    # Sorted by total time, slowest stage first
+    assert [line.split()[0] for line in stages[2:]] == ['parse', 'extract']
+    assert stages[2].split()[1] == '3'
+
+    stacks = (out / 'stacks.collapsed').read_text().splitlines()
+    assert any(line.startswith('parse;') for line in stacks)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in stacks)
+
+
+def test_nested_stages_are_timed_separately(tmp_path):
+    with profiling.session(str(tmp_path)) as profiler:
+        with profiling.stage('connect'):
+            with profiling.stage('dns'):
+                busy(0.01)
+            busy(0.01)
+
+    assert profiler.timings['dns'][0] == profiler.timings['connect'][0] == 1
+    assert profiler.timings['connect'][1] > profiler.timings['dns'][1]
+
+
+def test_no_session_is_a_no_op(tmp_path):
+    with profiling.session(None) as profiler:
+        with profiling.stage('parse'):
+            pass
+    assert profiler is None
+    assert profiling._active is None
+    assert os.listdir(tmp_path) == []
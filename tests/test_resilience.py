@@ -0,0 +1,137 @@
+"""Circuit breakers, latency percentiles and hedged requests in src/resilience.py"""
+
+import threading
+import time
+
+import pytest
+
+from resilience import (FAILURE_THRESHOLD, LATENCY_SLO, MIN_HEDGE_SAMPLES, CircuitBreaker,
+                        HostHealth, LatencyTracker, TenantDeferred)
+
+
+URL = 'https://acme.avature.net/careers/SearchJobs'
+
+
+def test_breaker_opens_after_threshold_failures():
+    breaker = CircuitBreaker()
+    for _ in range(FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.retry_at > time.time()
+
+
+def test_breaker_counts_slow_successes_as_breaches():
+    breaker = CircuitBreaker()
+    for _ in range(FAILURE_THRESHOLD):
+        breaker.record_success(LATENCY_SLO + 1)
+    assert not breaker.allow()
+
+
+def test_fast_success_resets_failure_count():
+    breaker = CircuitBreaker()
+    for _ in range(FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def open_breaker(cooldown=0.05):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=cooldown)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(cooldown * 1.5)
+    return breaker
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = open_breaker()
+    assert breaker.allow()          # the probe
+    assert not breaker.allow()      # everyone else waits for its result
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_breaker():
+    breaker = open_breaker()
+    assert breaker.allow()
+    breaker.record_success(0.1)
+    assert breaker.retry_at is None
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = open_breaker(cooldown=0.2)
+    breaker.consecutive_failures = 0
+    assert breaker.allow()
+    breaker.record_failure()        # below threshold, but it was the probe
+    assert not breaker.allow()
+
+
+def test_p95_needs_enough_samples():
+    tracker = LatencyTracker()
+    for latency in range(MIN_HEDGE_SAMPLES - 1):
+        tracker.record(latency)
+    assert tracker.p95() is None
+
+    tracker = LatencyTracker()
+    for latency in range(1, 101):
+        tracker.record(latency)
+    assert tracker.p95() == 95
+
+
+class ScriptedFetch:
+    """fetch_fn whose n-th call sleeps and returns script[n]"""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, **kwargs):
+        with self._lock:
+            delay, html = self.script[self.calls]
+            self.calls += 1
+        time.sleep(delay)
+        return html
+
+
+def warmed_up(latency=0.05):
+    health = HostHealth()
+    tracker = health.latency('acme.avature.net')
+    for _ in range(MIN_HEDGE_SAMPLES):
+        tracker.record(latency)
+    return health
+
+
+def test_open_breaker_defers_tenant():
+    health = HostHealth()
+    fetch = ScriptedFetch(*[(0, None)] * FAILURE_THRESHOLD)
+    for _ in range(FAILURE_THRESHOLD):
+        assert health.fetch(fetch, URL) is None
+    with pytest.raises(TenantDeferred):
+        health.fetch(fetch, URL)
+    assert fetch.calls == FAILURE_THRESHOLD
+
+
+def test_no_hedge_before_p95():
+    health = warmed_up()
+    fetch = ScriptedFetch((0, 'fast'), (0, 'unused'))
+    assert health.fetch(fetch, URL) == 'fast'
+    assert fetch.calls == 1 and health.requests == 1
+
+
+def test_hedge_fires_after_p95_and_fastest_wins():
+    health = warmed_up()
+    fetch = ScriptedFetch((0.5, 'slow'), (0, 'hedge'))
+    started = time.monotonic()
+    assert health.fetch(fetch, URL) == 'hedge'
+    assert time.monotonic() - started < 0.4
+    assert fetch.calls == 2 and health.requests == 2
+
+
+def test_hedge_skips_none_results():
+    health = warmed_up()
+    fetch = ScriptedFetch((0.15, None), (0.3, 'ok'))
+    assert health.fetch(fetch, URL) == 'ok'
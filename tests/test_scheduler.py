@@ -0,0 +1,69 @@
+"""Tenant scoring in src/scheduler.py"""
+
+from models import Job
+from scheduler import build_schedule, record_crawl
+
+
+NOW = 1_700_000_000.0
+DAY = 86400
+
+
+def jobs(count):
+    return [Job(f"Job {i}", f"/careers/JobDetail/{i}") for i in range(count)]
+
+
+def history():
+    h = {}
+    for day in range(10, 0, -1):
+        record_crawl(h, 'dead', [], 3, 90.0, now=NOW - day * DAY)
+    record_crawl(h, 'big', jobs(1300), 1420, 1500.0, now=NOW - 2 * DAY)
+    record_crawl(h, 'big', jobs(1330), 1450, 1600.0, now=NOW - DAY)
+    record_crawl(h, 'mid', jobs(100), 110, 120.0, now=NOW - 20 * DAY)
+    return h
+
+
+def ranking(h, **kwargs):
+    return [e['tenant'] for e in build_schedule(['dead', 'big', 'mid', 'never'], h, now=NOW, **kwargs)]
+
+
+def test_repeated_failures_push_tenant_to_the_bottom():
+    plan = build_schedule(['dead', 'big', 'mid', 'never'], history(), now=NOW)
+    assert [e['tenant'] for e in plan][-1] == 'dead'
+    assert plan[-1]['p_success'] < 0.001
+
+
+def test_failures_are_charged_their_observed_cost():
+    dead = build_schedule(['dead'], history(), now=NOW)[0]
+    assert round(dead['expected_requests']) == 3
+    assert round(dead['expected_seconds']) == 90
+
+
+def test_success_resets_failure_streak():
+    h = history()
+    record_crawl(h, 'dead', jobs(20), 23, 25.0, now=NOW - 5 * DAY)
+    assert h['dead']['consecutive_failures'] == 0
+    assert ranking(h)[-1] == 'big'      # crawled yesterday: little is new
+
+
+def test_legacy_history_without_failure_streak():
+    h = history()
+    h['legacy'] = {'attempts': 10, 'successes': 0, 'job_ids': [], 'requests': 1}
+    plan = build_schedule(['legacy', 'mid'], h, now=NOW)
+    assert plan[-1]['tenant'] == 'legacy'
+
+
+def test_time_budget_ranks_per_second_and_cuts_off():
+    h = history()
+    h['mid']['seconds'] = 20000.0      # very slow host
+    assert ranking(h) == ['never', 'mid', 'big', 'dead']
+    assert ranking(h, max_seconds=10 ** 6) == ['never', 'big', 'mid', 'dead']
+    assert len(build_schedule(['dead', 'big', 'mid', 'never'], h, max_seconds=100, now=NOW)) == 1
+
+
+def test_quiet_recrawl_does_not_pin_churn_to_zero():
+    h = {}
+    record_crawl(h, 'acme', jobs(50), 56, 60.0, now=NOW - 2 * DAY)
+    record_crawl(h, 'acme', jobs(50), 56, 60.0, now=NOW - DAY)
+    assert h['acme']['new_jobs'] == 0
+    assert h['acme']['churn_per_day'] > 0
+    assert build_schedule(['acme'], h, now=NOW + 30 * DAY)[0]['expected_new'] > 10
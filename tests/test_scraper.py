@@ -0,0 +1,122 @@
+"""Deferred tenants keep and resume their partial results in src/scraper.py"""
+
+import json
+import re
+import time
+
+import pytest
+
+import scraper
+
+
+TOTAL_JOBS = 30         # 3 listing pages
+
+
+class FlakyHost:
+    """
+    Stands in for the network. Every `burst` requests the host's circuit
+    opens (as after repeated latency-SLO breaches); `dead_after` makes
+    every request past that count hit an open circuit.
+    """
+
+    def __init__(self, burst=None, dead_after=None):
+        self.burst = burst
+        self.dead_after = dead_after
+        self.calls = 0
+        self.allowed = 0
+
+    def request(self):
+        self.calls += 1
+        if ((self.burst and self.calls % (self.burst + 1) == 0)
+                or (self.dead_after is not None and self.allowed >= self.dead_after)):
+            raise scraper.TenantDeferred('acme.avature.net', time.time())
+        self.allowed += 1
+
+    def fetch(self, url, **kwargs):
+        self.request()
+        return url
+
+    def details(self, job, base_domain, profile):
+        self.request()
+        job.description = f"Details of {job.title}"
+        return job
+
+
+def fake_listing(url):
+    match = re.search(r'jobOffset=(\d+)', url)
+    offset = int(match.group(1)) if match else 0
+    return [scraper.Job(f"Job {i}", f"/careers/JobDetail/{i}")
+            for i in range(offset, min(offset + 12, TOTAL_JOBS))]
+
+
+@pytest.fixture
+def host(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, '_profile_cache', None)
+    monkeypatch.setattr(scraper, 'parse_total_jobs', lambda html: TOTAL_JOBS)
+    monkeypatch.setattr(scraper, 'extract_jobs', fake_listing)
+
+    def install(**kwargs):
+        fake = FlakyHost(**kwargs)
+        monkeypatch.setattr(scraper, 'fetch_page_guarded', fake.fetch)
+        monkeypatch.setattr(scraper, 'scrape_job_details', fake.details)
+        return fake
+    return install
+
+
+def test_deferral_during_listing_resumes_from_next_page(host):
+    host(burst=2)
+    with pytest.raises(scraper.TenantDeferred) as info:
+        scraper.scrape_single_site('https://acme.avature.net/careers')
+    e = info.value
+    assert len(e.jobs) == 24 and e.next_page == 2     # count page + page 2 fetched
+
+    with pytest.raises(scraper.TenantDeferred) as info:
+        scraper.scrape_single_site('https://acme.avature.net/careers', e.jobs, e.next_page)
+    assert len(info.value.jobs) == TOTAL_JOBS and info.value.next_page is None
+    assert all(job.company_domain == 'acme.avature.net/careers' for job in info.value.jobs)
+
+
+def test_deferral_during_details_keeps_collected_jobs(host):
+    host(burst=5)
+    with pytest.raises(scraper.TenantDeferred) as info:
+        scraper.scrape_single_site('https://acme.avature.net/careers')
+    e = info.value
+    assert len(e.jobs) == TOTAL_JOBS and e.next_page is None
+    assert scraper._fetched(e.jobs) == 2
+
+    with pytest.raises(scraper.TenantDeferred) as info:
+        scraper.scrape_single_site('https://acme.avature.net/careers', e.jobs, e.next_page)
+    assert scraper._fetched(info.value.jobs) == 7
+
+
+def run_local(tmp_path):
+    url_file = tmp_path / 'urls.txt'
+    url_file.write_text('https://acme.avature.net/careers\n')
+    output = tmp_path / 'jobs.json'
+    scraper.run_local(str(url_file), str(output), history_file=str(tmp_path / 'history.json'))
+    return json.loads(output.read_text())['jobs']
+
+
+def test_slow_host_is_retried_while_it_makes_progress(host, tmp_path):
+    host(burst=5)
+    jobs = run_local(tmp_path)
+    assert len(jobs) == TOTAL_JOBS
+    assert all(job['description'].startswith('Details of') for job in jobs)
+
+
+def test_dead_host_keeps_jobs_collected_before_it_died(host, tmp_path):
+    host(dead_after=6)      # count page, 2 more listing pages, 3 details
+    jobs = run_local(tmp_path)
+    assert len(jobs) == TOTAL_JOBS
+    described = [job for job in jobs if job['description'].startswith('Details of')]
+    assert len(described) == 3
+    assert all(job['description'] == "Description unavailable - circuit open"
+               for job in jobs if job not in described)
+
+
+def test_modules_are_loaded_once():
+    import models
+    import resilience
+    assert scraper.Job is models.Job
+    assert scraper.TenantDeferred is resilience.TenantDeferred
@@ -0,0 +1,96 @@
+"""Description normalization and boilerplate references in src/text_normalize.py"""
+
+import json
+
+from bs4 import BeautifulSoup
+
+import cli
+from models import Job, write_jobs_json
+from text_normalize import BoilerplateStore, block_id, normalize_blocks, rebuild_description
+
+
+EEO = ("We are an equal opportunity employer and value diversity at our company. "
+       "We do not discriminate on the basis of race or religion.")
+
+
+def blocks(html):
+    return list(normalize_blocks(BeautifulSoup(html, 'lxml').body))
+
+
+def test_blocks_split_on_block_elements_and_collapse_whitespace():
+    html = """<div><h2>About   the
+              role</h2><p>Build <b>great</b>   things.</p>
+              <ul><li>Python</li><li>SQL</li></ul>Tail after list</div>"""
+    assert blocks(html) == ['About the role', 'Build great things.', 'Python', 'SQL',
+                            'Tail after list']
+
+
+def test_scripts_styles_and_comments_are_dropped():
+    html = """<div><p>Keep</p><script>var x = 1;</script><style>p {}</style>
+              <!-- internal note --><p>Also keep</p></div>"""
+    assert blocks(html) == ['Keep', 'Also keep']
+
+
+def test_br_starts_a_new_block():
+    assert blocks('<p>Line one<br>Line two<br/><br/>Line three</p>') == \
+        ['Line one', 'Line two', 'Line three']
+
+
+def test_empty_blocks_are_skipped():
+    assert blocks('<div><p>   </p><p>\n</p><p>Text</p></div>') == ['Text']
+
+
+def test_first_copy_stays_inline_and_repeats_become_references():
+    store = BoilerplateStore()
+    first = store.dedupe(f"Job one\n{EEO}", 'acme')
+    second = store.dedupe(f"Job two\n{EEO}", 'acme')
+
+    assert first == f"Job one\n{EEO}"
+    assert second == f"Job two\n{{{{boilerplate:{block_id(EEO)}}}}}"
+    assert store.blocks == {block_id(EEO): EEO}
+
+
+def test_short_blocks_and_other_tenants():
+    store = BoilerplateStore()
+    assert store.dedupe("Apply now\nApply now", 'acme') == "Apply now\nApply now"
+
+    # Seen once by acme only: globex still gets its own inline copy
+    store.dedupe(EEO, 'acme')
+    assert store.dedupe(EEO, 'globex') == EEO
+    assert store.blocks == {}
+
+    # Once stored, every tenant references it
+    store.dedupe(EEO, 'acme')
+    assert store.dedupe(EEO, 'initech') == f"{{{{boilerplate:{block_id(EEO)}}}}}"
+
+
+def test_rebuild_expands_references_and_keeps_unknown_ones():
+    store = BoilerplateStore()
+    store.dedupe(EEO, 'acme')
+    text = store.dedupe(f"Job\n{EEO}", 'acme')
+    assert rebuild_description(text, store.blocks) == f"Job\n{EEO}"
+    assert rebuild_description("{{boilerplate:0000000000000000}}", {}) == \
+        "{{boilerplate:0000000000000000}}"
+    assert rebuild_description(None, store.blocks) is None
+
+
+def test_export_round_trip_restores_descriptions(tmp_path):
+    originals = [f"Job {i}\n{EEO}" for i in range(3)]
+    store = BoilerplateStore()
+    jobs = [Job(f"Job {i}", f"/careers/JobDetail/{i}", description=store.dedupe(text, 'acme'),
+                company_domain='acme')
+            for i, text in enumerate(originals)]
+    source = tmp_path / 'all_jobs.json'
+    with open(source, 'w') as f:
+        write_jobs_json(jobs, f, {'total_jobs': len(jobs), 'boilerplate': store.blocks})
+    assert '{{boilerplate:' in source.read_text()
+
+    exported = tmp_path / 'jobs.jsonl'
+    cli.main(['export', '--input', str(source), '--output', str(exported)])
+    with open(exported) as f:
+        assert [json.loads(line)['description'] for line in f] == originals
+
+    kept = tmp_path / 'refs.jsonl'
+    cli.main(['export', '--input', str(source), '--output', str(kept), '--keep-refs'])
+    with open(kept) as f:
+        assert [json.loads(line)['description'] for line in f] == [job.description for job in jobs]
@@ -0,0 +1,104 @@
+"""Seeding and drain detection of src/work_queue.py"""
+
+import threading
+
+import scraper
+from models import Job
+from work_queue import WorkQueue
+
+
+def test_empty_queue_is_not_finished_until_seeded(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    assert queue.is_drained()
+    assert not queue.is_finished()
+
+    queue.mark_seeded()
+    assert queue.is_finished()
+
+    queue.mark_seeded(False)
+    assert not queue.is_finished()
+
+
+def test_pending_tasks_keep_seeded_queue_open(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    queue.enqueue('tenant', {'base_domain': 'https://acme.avature.net/careers'})
+    queue.mark_seeded()
+    assert not queue.is_finished()
+
+    task_id, _, _ = queue.lease('w1')
+    assert not queue.is_finished()
+    queue.complete(task_id, 'w1')
+    assert queue.is_finished()
+
+
+def test_worker_started_before_coordinator_waits_for_seed(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    queue = WorkQueue(path)
+    worker = threading.Thread(target=scraper.run_worker, args=(path, 'w1', 0.01))
+    worker.start()
+
+    worker.join(0.2)
+    assert worker.is_alive()        # empty, unseeded queue: keep polling
+
+    queue.mark_seeded()
+    worker.join(2)
+    assert not worker.is_alive()
+
+
+def test_costs_accumulate_per_tenant(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    queue.add_cost('https://acme.avature.net/careers', 3, 1.5)
+    queue.add_cost('https://acme.avature.net/careers', 14, 6.0)
+    queue.add_cost('https://globex.avature.net/careers', 1, 30.0)
+    assert queue.load_costs() == {
+        'https://acme.avature.net/careers': (17, 7.5),
+        'https://globex.avature.net/careers': (1, 30.0),
+    }
+
+
+def finished_run(path):
+    queue = WorkQueue(path)
+    queue.begin_run()
+    queue.enqueue('tenant', {'base_domain': 'https://acme.avature.net/careers'})
+    queue.mark_seeded()
+    task_id, _, _ = queue.lease('w1')
+    queue.save_jobs([Job('Engineer', '/careers/JobDetail/1', company_domain='acme.avature.net/careers')])
+    queue.add_cost('https://acme.avature.net/careers', 2, 1.0)
+    queue.complete(task_id, 'w1')
+    return queue
+
+
+def test_rerun_on_finished_queue_starts_fresh(tmp_path):
+    queue = finished_run(str(tmp_path / 'queue.db'))
+    assert queue.is_finished()
+
+    assert queue.begin_run()
+    assert not queue.is_seeded()
+    assert queue.load_jobs() == [] and queue.load_costs() == {}
+    queue.enqueue('tenant', {'base_domain': 'https://acme.avature.net/careers'})
+    assert queue.counts() == {'pending': 1}
+
+
+def test_restart_mid_run_resumes(tmp_path):
+    queue = finished_run(str(tmp_path / 'queue.db'))
+    queue.enqueue('listing', {'base_domain': 'https://acme.avature.net/careers', 'offset': 12})
+
+    assert not queue.begin_run()
+    assert not queue.is_seeded()
+    assert queue.counts() == {'done': 1, 'pending': 1}
+    assert len(queue.load_jobs()) == 1
+
+
+def test_worker_waits_out_a_finished_run_from_before_it_started(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    queue = finished_run(path)
+    worker = threading.Thread(target=scraper.run_worker, args=(path, 'w2', 0.01))
+    worker.start()
+
+    worker.join(0.2)
+    assert worker.is_alive()        # old run: not this worker's to finish
+
+    queue.begin_run()
+    queue.mark_seeded()             # new, empty run
+    worker.join(2)
+    assert not worker.is_alive()